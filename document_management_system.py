@@ -3,6 +3,7 @@ from typing import List, Set, Tuple, Dict, Any, Optional
 
 from models.access_control import AccessControl
 from models.document import Document
+from models.registry import Registry
 from enums import AccessLevelEnum, ReportTypeEnum, DocumentTypeEnum
 from models.report import Report
 from models.search import Search
@@ -11,6 +12,7 @@ from models.user import User
 from models.workflow import Workflow
 from services.document_analytics import DocumentAnalytics
 from services.external_integration import ExternalIntegration
+from services.version_control.models import DiffHunk
 from services.version_control.version_control_system import VersionControl
 
 
@@ -28,44 +30,64 @@ class SingletonMeta(type):
 
 
 class DocumentManagementSystem(metaclass=SingletonMeta):
-    def __init__(self):
-        self._users = []
-        self._documents = []
-        self._workflows = []
-        self._tasks = []
+    def __init__(self, storage_path: Optional[str] = None):
+        self._users = Registry(unique_attributes=('username',))
+        self._documents = Registry()
+        self._workflows = Registry()
+        self._tasks = Registry()
         self._search_engine = Search()
         self._access_control = AccessControl()
         self._document_analytics = DocumentAnalytics()
-        self._version_control = VersionControl()
+        self._version_control = VersionControl(storage_path=storage_path)
+        # Persisted histories are keyed by document id, so new documents are numbered after them
+        Document.reserve_ids(self._version_control.get_last_document_id())
         self._external_integration = ExternalIntegration()
 
     def add_user(self, new_user: User) -> None:
         """
         Add a new user to the system.
         """
-        # if self._validate_user(new_user):
-        self._users.append(new_user)
+        self._validate_user(new_user)
+        self._users.add(new_user)
         print(f"User {new_user.username} added successfully.")
 
     def remove_user(self, user_id: int) -> bool:
         """
         Remove a user from the system.
         """
+        user = self._users.remove(user_id)
+        if user is None:
+            return False
 
-        for user_index, user in enumerate(self._users):
-            if user.id == user_id:
-                del self._users[user_index]
-                print(f"User {user.username} removed successfully.")
-                return True
-        return False
+        print(f"User {user.username} removed successfully.")
+        return True
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        """
+        Get a user by id.
+        """
+        return self._users.get(user_id)
+
+    def get_user_by_username(self, username: str) -> Optional[User]:
+        """
+        Get a user by username.
+        """
+        return self._users.get_by('username', username)
+
+    def get_document(self, document_id: int) -> Optional[Document]:
+        """
+        Get a document by id.
+        """
+        return self._documents.get(document_id)
 
     def create_document(self, title: str, content: str, author: User, document_type: DocumentTypeEnum) -> Document:
         """
         Create a new document in the system.
         """
         new_document = Document(title, content, author, document_type)
-        self._documents.append(new_document)
+        self._documents.add(new_document)
         self._access_control.grant_access(document=new_document, user=author, level=AccessLevelEnum.OWNER)
+        self._index_document(new_document)
         print(f"Document '{title}' created successfully.")
 
         # Initialize version control for the new document
@@ -81,25 +103,40 @@ class DocumentManagementSystem(metaclass=SingletonMeta):
         """
         new_task = Task(document=document, assignee=assignee, deadline=deadline)
 
-        self._tasks.append(new_task)
+        self._tasks.add(new_task)
         return new_task
 
     def generate_report(self, report_type: ReportTypeEnum, start_date: datetime, end_date: datetime) -> Report:
         report = Report(report_type=report_type, period=(start_date, end_date))
-        report.generate_report(self._documents)
+        report.generate_report(list(self._documents))
         return report
 
     def search_documents(self) -> list:
         """
         Search for documents based on a query string.
         """
-        return self._search_engine.execute_search(documents=self._documents)
+        return self._search_engine.execute_search()
+
+    def _index_document(self, document: Document) -> None:
+        """
+        Add the document to the search index and keep search and analytics in sync with content updates.
+        """
+        self._search_engine.index_document(document)
+        document.add_content_observer(self._search_engine.index_document)
+        document.add_content_observer(self._document_analytics.analyze_document)
 
     def get_user_documents(self, user: User) -> List[Document]:
         """
         Get all documents associated with a user.
         """
-        return [doc for doc in self._documents if user in doc.access_control]
+        return self._resolve_documents(list(self._access_control.get_user_access(user)))
+
+    def list_accessible_documents(self, user: User, min_level: AccessLevelEnum = AccessLevelEnum.READ_ONLY
+                                  ) -> List[Document]:
+        """
+        Get the documents a user can access with at least the given level.
+        """
+        return self._resolve_documents(self._access_control.list_accessible(user, min_level))
 
     def _validate_user(self, new_user: User) -> bool:
         """
@@ -107,9 +144,9 @@ class DocumentManagementSystem(metaclass=SingletonMeta):
         """
         if not isinstance(new_user, User):
             raise TypeError("Invalid user type.")
-        elif any(user.id == new_user.id for user in self._users):
+        elif self._users.get(new_user.id) is not None:
             raise ValueError("User already exists.")
-        elif any(user.username == new_user.username for user in self._users):
+        elif self._users.get_by('username', new_user.username) is not None:
             raise ValueError("Email already exists.")
         else:
             return True
@@ -120,7 +157,7 @@ class DocumentManagementSystem(metaclass=SingletonMeta):
         """
 
         workflow = Workflow(document_type=document_type, workflow_steps=workflow_steps)
-        self._workflows.append(workflow)
+        self._workflows.add(workflow)
         return workflow
 
     def assign_workflow_to_document(self, document: Document, workflow: "Workflow", user: User) -> bool:
@@ -155,19 +192,39 @@ class DocumentManagementSystem(metaclass=SingletonMeta):
         """
         return self._document_analytics.analyze_document(document)
 
+    def analyze_documents(self, documents: List[Document], max_workers: Optional[int] = None) -> Dict[int, Set[str]]:
+        """
+        Analyzes a batch of documents in parallel and extracts their keywords.
+        """
+        return self._document_analytics.analyze_documents(documents, max_workers=max_workers)
+
     def find_document_duplicates(self, document: Document) -> List[Document]:
         """
         Finds duplicate documents based on the analyzed keywords.
         """
         duplicate_ids = self._document_analytics.find_duplicates(document)
-        return [doc for doc in self._documents if doc.id in duplicate_ids]
+        return self._resolve_documents(duplicate_ids)
 
     def find_related_documents(self, document: Document) -> List[Document]:
         """
         Finds related documents based on the analyzed keywords.
         """
         related_ids = self._document_analytics.find_related_documents(document)
-        return [doc for doc in self._documents if doc.id in related_ids]
+        return self._resolve_documents(related_ids)
+
+    def find_top_related_documents(self, document: Document, top_k: int = 10) -> List[Document]:
+        """
+        Finds the top-k related documents, best match first.
+        """
+        ranked = self._document_analytics.find_top_related_documents(document, top_k=top_k)
+        return self._resolve_documents([doc_id for doc_id, _ in ranked])
+
+    def _resolve_documents(self, document_ids: List[int]) -> List[Document]:
+        """
+        Map document ids to the documents registered in the system.
+        """
+        documents = (self._documents.get(document_id) for document_id in document_ids)
+        return [document for document in documents if document is not None]
 
     def create_branch(self, document: Document, branch_name: str, user: User) -> bool:
         """
@@ -188,11 +245,37 @@ class DocumentManagementSystem(metaclass=SingletonMeta):
         """
         return self._version_control.merge_branches(document, source_branch, target_branch, user)
 
-    def get_document_version_history(self, document: Document) -> List[Dict]:
-        """
-        Get the version history of a document.
-        """
-        return self._version_control.get_version_history(document)
+    def get_document_version_history(
+            self,
+            document: Document,
+            branch_name: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            newest_first: bool = False,
+            include_content: bool = True,
+    ) -> List[Dict]:
+        """
+        Get a page of the version history of a document.
+        """
+        return self._version_control.get_version_history(
+            document, branch_name, offset=offset, limit=limit, newest_first=newest_first,
+            include_content=include_content,
+        )
+
+    def get_document_diff(
+            self,
+            document: Document,
+            from_version: int,
+            to_version: int,
+            from_branch: Optional[str] = None,
+            to_branch: Optional[str] = None,
+            context: int = 3,
+    ) -> Optional[List[DiffHunk]]:
+        """
+        Get the line-level differences between two versions of a document.
+        """
+        return self._version_control.diff_versions(
+            document, from_version, to_version, from_branch=from_branch, to_branch=to_branch, context=context)
 
     def export_document_to_external_system(self, document: Document, system_type: str, user: User) -> Dict[str, Any]:
         """
@@ -206,8 +289,9 @@ class DocumentManagementSystem(metaclass=SingletonMeta):
         """
         document = self._external_integration.import_document(system_type, external_id, user)
         if document:
-            self._documents.append(document)
+            self._documents.add(document)
             self._access_control.grant_access(document=document, user=user, level=AccessLevelEnum.OWNER)
+            self._index_document(document)
 
             if hasattr(self, '_version_control'):
                 self._version_control.initialize_version_control(document)
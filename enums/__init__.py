@@ -2,6 +2,7 @@ from .access_level import AccessLevelEnum
 from .document_status import DocumentStatusEnum
 from .document_type import DocumentTypeEnum
 from .export_format import ExportFormatEnum
+from .lock_mode import LockModeEnum
 from .position import PositionEnum
 from .report_type import ReportTypeEnum
 from .signature_type import SignatureTypeEnum
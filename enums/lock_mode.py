@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class LockModeEnum(Enum):
+    """
+    Enum representing the modes a document can be locked in.
+    """
+    SHARED = "Shared"
+    EXCLUSIVE = "Exclusive"
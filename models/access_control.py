@@ -1,21 +1,35 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
 from enums import AccessLevelEnum
 from .document import Document
+from .group import Group
 from .user import User
 
 
 class AccessControl:
-    def __init__(self):
+    def __init__(self, decision_cache_size: int = 1024):
         self.document_access = {}  # {document.id: {user.id: access_level}}
+        self.user_access = {}  # {user.id: {document.id: access_level}} - reverse of document_access
+        self.group_access = {}  # {document.id: {group.id: access_level}}
+        self.group_documents = {}  # {group.id: {document.id: access_level}} - reverse of group_access
+        self.groups = {}  # {group.id: group} - groups whose membership is tracked
+        self.user_groups = {}  # {user.id: set(group.ids)} - membership of the tracked groups
+
+        # Recent check_access decisions, least recently used first. A decision is valid while the generations
+        # of its document and user are unchanged; grants bump the document, membership changes bump the user.
+        self.decision_cache = OrderedDict()  # {(document.id, user.id, level): ((document gen, user gen), decision)}
+        self.decision_cache_size = decision_cache_size
+        self.document_generations = {}  # {document.id: generation}
+        self.user_generations = {}  # {user.id: generation}
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def grant_access(self, document: Document, user: User, level: AccessLevelEnum):
         """
         Grant access to a user for a specific document.
         """
-        if document.id not in self.document_access:
-            self.document_access[document.id] = {}
-
-        self.document_access[document.id][user.id] = level
-        user.documents.append(document)
+        self._set_user_level(document, user, level)
         document.add_history_entry(f"Access granted to {user.username} with level {level.name}.")
 
     def revoke_access(self, document: Document, user: User):
@@ -23,17 +37,260 @@ class AccessControl:
         Revoke access from a user for a specific document.
         """
         if document.id in self.document_access and user.id in self.document_access[document.id]:
-            del self.document_access[document.id][user.id]
-            user.documents.remove(document)
+            self._remove_user_level(document, user)
             document.add_history_entry(f"Access revoked from {user.username}.")
         else:
             raise ValueError(f"{user.username} does not have access to this document.")
 
+    def _set_user_level(self, document: Document, user: User, level: AccessLevelEnum) -> None:
+        self._invalidate_document(document.id)
+        if document.id not in self.document_access:
+            self.document_access[document.id] = {}
+
+        self.document_access[document.id][user.id] = level
+        if user.id not in self.user_access:
+            self.user_access[user.id] = {}
+        self.user_access[user.id][document.id] = level
+        user.add_document(document)
+
+    def _remove_user_level(self, document: Document, user: User) -> None:
+        self._invalidate_document(document.id)
+        del self.document_access[document.id][user.id]
+        del self.user_access[user.id][document.id]
+        if not self.user_access[user.id]:
+            del self.user_access[user.id]
+        user.remove_document(document)
+
+    def register_group(self, group: Group) -> None:
+        """
+        Track the membership of a group so its grants apply to its members.
+        """
+        if group.id in self.groups:
+            return
+
+        self.groups[group.id] = group
+        for member in group.members:
+            if member is not None:
+                self.user_groups.setdefault(member.id, set()).add(group.id)
+        group.add_membership_observer(self._update_membership)
+
+    def _update_membership(self, group: Group, user: User, is_member: bool) -> None:
+        """
+        Keep the user to groups index in sync with a membership change.
+        """
+        if user is None:
+            return
+
+        self._invalidate_user(user.id)
+        if is_member:
+            self.user_groups.setdefault(user.id, set()).add(group.id)
+            return
+
+        groups = self.user_groups.get(user.id)
+        if groups is not None:
+            groups.discard(group.id)
+            if not groups:
+                del self.user_groups[user.id]
+
+    def grant_group_access(self, document: Document, group: Group, level: AccessLevelEnum):
+        """
+        Grant access to every member of a group for a specific document.
+        """
+        self._set_group_level(document, group, level)
+        document.add_history_entry(f"Access granted to group {group.name} with level {level.name}.")
+
+    def revoke_group_access(self, document: Document, group: Group):
+        """
+        Revoke access from a group for a specific document.
+        """
+        if document.id in self.group_access and group.id in self.group_access[document.id]:
+            self._remove_group_level(document, group)
+            document.add_history_entry(f"Access revoked from group {group.name}.")
+        else:
+            raise ValueError(f"{group.name} does not have access to this document.")
+
+    def _set_group_level(self, document: Document, group: Group, level: AccessLevelEnum) -> None:
+        self._invalidate_document(document.id)
+        self.register_group(group)
+        if document.id not in self.group_access:
+            self.group_access[document.id] = {}
+
+        self.group_access[document.id][group.id] = level
+        if group.id not in self.group_documents:
+            self.group_documents[group.id] = {}
+        self.group_documents[group.id][document.id] = level
+
+    def _remove_group_level(self, document: Document, group: Group) -> None:
+        self._invalidate_document(document.id)
+        del self.group_access[document.id][group.id]
+        del self.group_documents[group.id][document.id]
+        if not self.group_documents[group.id]:
+            del self.group_documents[group.id]
+
+    def grant_access_bulk(
+            self,
+            grants: Iterable[Tuple[Document, Union[User, Group], AccessLevelEnum]],
+    ) -> Dict[str, Any]:
+        """
+        Grant many accesses to users and groups in one pass, writing a single history entry per document.
+        Every grant is validated before any is applied, so an invalid grant leaves all access unchanged.
+        """
+        grants = list(grants)
+        for document, principal, level in grants:
+            self._validate_bulk_target(document, principal)
+            if not isinstance(level, AccessLevelEnum):
+                raise ValueError(f"Invalid access level: '{level}'")
+
+        changes = {}  # {document.id: (document, [granted principal descriptions])}
+        for document, principal, level in grants:
+            if isinstance(principal, Group):
+                self._set_group_level(document, principal, level)
+            else:
+                self._set_user_level(document, principal, level)
+            changes.setdefault(document.id, (document, []))[1].append(
+                f"{self._describe_principal(principal)} with level {level.name}")
+
+        for document, descriptions in changes.values():
+            document.add_history_entry(f"Access granted to {', '.join(descriptions)}.")
+
+        return self._bulk_summary("granted", len(grants), changes)
+
+    def revoke_access_bulk(self, revocations: Iterable[Tuple[Document, Union[User, Group]]]) -> Dict[str, Any]:
+        """
+        Revoke many accesses from users and groups in one pass, writing a single history entry per document.
+        If any revocation has no matching grant, nothing is revoked and a ValueError is raised.
+        """
+        revocations = list(revocations)
+        pending = set()  # {(principal kind, document.id, principal.id)}
+        for document, principal in revocations:
+            self._validate_bulk_target(document, principal)
+            if isinstance(principal, Group):
+                granted = principal.id in self.group_access.get(document.id, {})
+            else:
+                granted = principal.id in self.document_access.get(document.id, {})
+            key = ("group" if isinstance(principal, Group) else "user", document.id, principal.id)
+            if not granted or key in pending:
+                name = principal.name if isinstance(principal, Group) else principal.username
+                raise ValueError(f"{name} does not have access to this document.")
+            pending.add(key)
+
+        changes = {}  # {document.id: (document, [revoked principal descriptions])}
+        for document, principal in revocations:
+            if isinstance(principal, Group):
+                self._remove_group_level(document, principal)
+            else:
+                self._remove_user_level(document, principal)
+            changes.setdefault(document.id, (document, []))[1].append(self._describe_principal(principal))
+
+        for document, descriptions in changes.values():
+            document.add_history_entry(f"Access revoked from {', '.join(descriptions)}.")
+
+        return self._bulk_summary("revoked", len(revocations), changes)
+
+    @staticmethod
+    def _validate_bulk_target(document: Any, principal: Any) -> None:
+        """
+        Reject a bulk entry whose document or principal has the wrong type, before anything is applied.
+        """
+        if not isinstance(document, Document):
+            raise ValueError(f"Invalid document: {document!r}")
+        if not isinstance(principal, (User, Group)):
+            raise ValueError(f"Invalid principal {principal!r}: not a user or a group.")
+
+    @staticmethod
+    def _describe_principal(principal: Union[User, Group]) -> str:
+        if isinstance(principal, Group):
+            return f"group {principal.name}"
+        return principal.username
+
+    @staticmethod
+    def _bulk_summary(action: str, count: int, changes: Dict[int, Tuple[Document, List[str]]]) -> Dict[str, Any]:
+        """
+        Summarize a bulk change: {action: count, "documents": {document.id: changes to the document}}.
+        """
+        return {
+            action: count,
+            "documents": {document_id: len(descriptions) for document_id, (_, descriptions) in changes.items()},
+        }
+
+    def get_access_level(self, document: Document, user: User) -> Optional[AccessLevelEnum]:
+        """
+        Get the effective access level of a user for a document: the highest of the user's own grant
+        and the grants of the groups the user belongs to. None if nothing was granted.
+        """
+        levels = []
+        user_level = self.document_access.get(document.id, {}).get(user.id)
+        if user_level is not None:
+            levels.append(user_level)
+
+        document_groups = self.group_access.get(document.id)
+        if document_groups:
+            for group_id in self.user_groups.get(user.id, ()):
+                if group_id in document_groups:
+                    levels.append(document_groups[group_id])
+
+        return max(levels, key=lambda level: level.value, default=None)
+
     def check_access(self, document: Document, user: User, required_level: AccessLevelEnum) -> bool:
         """
-        Check if a user has the required access level for a document.
+        Check if a user has the required access level for a document, directly or through a group.
+        Decisions are cached until a grant on the document or the user's group membership changes.
         """
-        if document.id in self.document_access and user.id in self.document_access[document.id]:
-            user_level = self.document_access[document.id][user.id].value
-            return user_level >= required_level.value
-        return False
+        cache_key = (document.id, user.id, required_level)
+        generations = (self.document_generations.get(document.id, 0), self.user_generations.get(user.id, 0))
+        cached = self.decision_cache.get(cache_key)
+        if cached is not None and cached[0] == generations:
+            self.decision_cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            return cached[1]
+
+        self.cache_misses += 1
+        user_level = self.get_access_level(document, user)
+        decision = user_level is not None and user_level.value >= required_level.value
+
+        self.decision_cache[cache_key] = (generations, decision)
+        self.decision_cache.move_to_end(cache_key)
+        if len(self.decision_cache) > self.decision_cache_size:
+            self.decision_cache.popitem(last=False)
+        return decision
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Get the hit and miss counters and the size of the decision cache.
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self.decision_cache)}
+
+    def clear_decision_cache(self) -> None:
+        """
+        Drop all cached decisions and reset the counters.
+        """
+        self.decision_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _invalidate_document(self, document_id: int) -> None:
+        self.document_generations[document_id] = self.document_generations.get(document_id, 0) + 1
+
+    def _invalidate_user(self, user_id: int) -> None:
+        self.user_generations[user_id] = self.user_generations.get(user_id, 0) + 1
+
+    def get_user_access(self, user: User) -> Dict[int, AccessLevelEnum]:
+        """
+        Get the effective access levels of a user, keyed by document id.
+        Documents granted directly come first, followed by documents granted through groups.
+        """
+        access = dict(self.user_access.get(user.id, {}))
+        for group_id in self.user_groups.get(user.id, ()):
+            for document_id, level in self.group_documents.get(group_id, {}).items():
+                if document_id not in access or level.value > access[document_id].value:
+                    access[document_id] = level
+        return access
+
+    def list_accessible(self, user: User, min_level: AccessLevelEnum = AccessLevelEnum.READ_ONLY) -> List[int]:
+        """
+        List the ids of the documents a user can access with at least the given level.
+        """
+        return [
+            document_id for document_id, level in self.get_user_access(user).items()
+            if level.value >= min_level.value
+        ]
@@ -1,5 +1,6 @@
+import hashlib
 from datetime import datetime
-from typing import List, Dict, Union
+from typing import Callable, List, Dict, Union
 
 from enums import DocumentStatusEnum, DocumentTypeEnum
 from .user import User
@@ -12,8 +13,10 @@ class Document:
 
     def __init__(self, title: str, content: str, author: User, document_type: DocumentTypeEnum) -> None:
         self.id = self._get_document_id()
+        self.content_observers = []  # callables notified with the document after its content changes
         self.title = title
-        self.content = content
+        self._content = content
+        self._content_digest = None  # digest of the content, computed on first use after each change
         self.author = author
         self.created_date = datetime.now()
         self.last_modified_date = datetime.now()
@@ -24,6 +27,43 @@ class Document:
 
         self.add_history_entry(entry_message="Document created.")
 
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, new_content: str) -> None:
+        self._content = new_content
+        self._content_digest = None
+        for observer in self.content_observers:
+            observer(self)
+
+    @property
+    def content_digest(self) -> str:
+        """
+        Digest of the current content, hashed once per content change.
+        """
+
+        if self._content_digest is None:
+            self._content_digest = self.hash_content(self._content)
+        return self._content_digest
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """
+        Compute the digest that identifies a content.
+        """
+
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def add_content_observer(self, observer: Callable[["Document"], None]) -> None:
+        """
+        Register a callable to be notified whenever the document content changes.
+        """
+
+        if observer not in self.content_observers:
+            self.content_observers.append(observer)
+
     @classmethod
     def _get_document_id(cls) -> int:
         """
@@ -33,6 +73,14 @@ class Document:
         cls.global_document_id += 1
         return cls.global_document_id
 
+    @classmethod
+    def reserve_ids(cls, last_id: int) -> None:
+        """
+        Make sure new documents get IDs above last_id, for example the highest ID of persisted documents.
+        """
+
+        cls.global_document_id = max(cls.global_document_id, last_id)
+
     def add_history_entry(self, entry_message: str) -> None:
         """
         Adds an entry to the document's history.
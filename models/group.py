@@ -0,0 +1,55 @@
+from typing import Callable, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.user import User
+
+
+class Group:
+    global_group_id = 0
+
+    def __init__(self, name: str, members: List['User'] = None) -> None:
+        self.id = self._get_group_id()
+        self.name = name
+        self.members = list(members) if members else []
+        self.membership_observers = []  # callables notified with (group, user, is_member) after membership changes
+
+    @classmethod
+    def _get_group_id(cls) -> int:
+        """
+        Get a unique group ID from class variable.
+        """
+
+        cls.global_group_id += 1
+        return cls.global_group_id
+
+    def add_member(self, user: 'User') -> None:
+        """
+        Add a new member to the group.
+        """
+        self.members.append(user)
+        self._notify_membership(user)
+
+    def remove_member(self, user: 'User') -> None:
+        """
+        Remove a member from the group.
+        """
+        if user in self.members:
+            self.members.remove(user)
+            self._notify_membership(user)
+        else:
+            raise ValueError(f"{user.username} is not a member of this {self._kind()}.")
+
+    def add_membership_observer(self, observer: Callable[['Group', 'User', bool], None]) -> None:
+        """
+        Register a callable to be notified whenever a member is added or removed.
+        """
+        if observer not in self.membership_observers:
+            self.membership_observers.append(observer)
+
+    def _notify_membership(self, user: 'User') -> None:
+        is_member = user in self.members
+        for observer in self.membership_observers:
+            observer(self, user, is_member)
+
+    def _kind(self) -> str:
+        return type(self).__name__.lower()
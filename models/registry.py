@@ -0,0 +1,59 @@
+from typing import Any, Iterator, Optional, Tuple
+
+
+class Registry:
+    """
+    Collection of system entities keyed by id, with optional unique secondary keys.
+    """
+
+    def __init__(self, unique_attributes: Tuple[str, ...] = ()) -> None:
+        self._items = {}  # {item.id: item}
+        self._unique_indexes = {attribute: {} for attribute in unique_attributes}  # {attribute: {value: item}}
+
+    def add(self, item: Any) -> None:
+        """
+        Add an item to the registry.
+        """
+        if item.id in self._items:
+            raise ValueError(f"Item with id {item.id} is already registered.")
+
+        for attribute, index in self._unique_indexes.items():
+            if getattr(item, attribute) in index:
+                raise ValueError(f"Item with {attribute} '{getattr(item, attribute)}' is already registered.")
+
+        self._items[item.id] = item
+        for attribute, index in self._unique_indexes.items():
+            index[getattr(item, attribute)] = item
+
+    def remove(self, item_id: int) -> Optional[Any]:
+        """
+        Remove an item by id and return it, or None if it is not registered.
+        """
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return None
+
+        for attribute, index in self._unique_indexes.items():
+            index.pop(getattr(item, attribute), None)
+        return item
+
+    def get(self, item_id: int) -> Optional[Any]:
+        """
+        Get an item by id.
+        """
+        return self._items.get(item_id)
+
+    def get_by(self, attribute: str, value: Any) -> Optional[Any]:
+        """
+        Get an item by one of its unique attributes.
+        """
+        return self._unique_indexes[attribute].get(value)
+
+    def __contains__(self, item: Any) -> bool:
+        return self._items.get(getattr(item, 'id', None)) is item
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -1,31 +1,135 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .document import Document
+from .search_index import InvertedIndex, TrigramIndex, intersect_postings, tokenize
 from enums import DocumentStatusEnum
 
 
 class Search:
-    def __init__(self, criteria: Dict[str, str] = None) -> None:
+    TOKEN_MODE = "token"
+    SUBSTRING_MODE = "substring"
+
+    def __init__(self, criteria: Dict[str, str] = None, mode: str = TOKEN_MODE) -> None:
+        if mode not in (self.TOKEN_MODE, self.SUBSTRING_MODE):
+            raise ValueError(f"Unsupported search mode: '{mode}'")
+
         self.criteria = criteria or {}
+        self.mode = mode
+        self.indexed_documents = {}  # {document_id: document}
+        self.content_index = InvertedIndex()
+        self.title_index = TrigramIndex()  # {document_id: title}
+        self.author_index = TrigramIndex()  # {user_id: username}
+        self.author_documents = {}  # {user_id: set(document_ids)}
 
-    def execute_search(self, documents: List[Document]) -> List[Document]:
-        results = documents
+    def index_document(self, document: Document) -> None:
+        """
+        Add a document to the search index or refresh its indexed text.
+        """
+
+        self.indexed_documents[document.id] = document
+        self.content_index.add(document.id, document.content)
+        self.title_index.add(document.id, document.title)
+
+        author = document.author
+        if hasattr(author, 'username'):
+            self.author_index.add(author.id, author.username)
+            if author.id not in self.author_documents:
+                self.author_documents[author.id] = set()
+            self.author_documents[author.id].add(document.id)
+
+    def remove_document(self, document_id: int) -> None:
+        """
+        Remove a document from the search index.
+        """
+
+        document = self.indexed_documents.pop(document_id, None)
+        if document is None:
+            return
+
+        self.content_index.remove(document_id)
+        self.title_index.remove(document_id)
+
+        author = document.author
+        if hasattr(author, 'username') and author.id in self.author_documents:
+            self.author_documents[author.id].discard(document_id)
+            if not self.author_documents[author.id]:
+                del self.author_documents[author.id]
+                self.author_index.remove(author.id)
+
+    def execute_search(self, documents: Optional[List[Document]] = None) -> List[Document]:
+        """
+        Execute the search over the given documents, or over the index when no documents are given.
+        """
+
+        if documents is not None:
+            return self._filter_documents(documents, self.criteria)
+
+        candidate_sets = []
 
         if 'title' in self.criteria:
-            title_query = self.criteria['title'].lower()
-            results = [doc for doc in results if title_query in doc.title.lower()]
+            candidate_sets.append(self.title_index.search(self.criteria['title']))
 
         if 'author' in self.criteria:
-            author_name = self.criteria['author'].lower()
+            author_ids = self.author_index.search(self.criteria['author'])
+            candidate_sets.append(
+                set().union(*(self.author_documents[author_id] for author_id in author_ids))
+            )
+
+        if 'content' in self.criteria and self.mode == self.TOKEN_MODE:
+            content_ids = self.content_index.lookup(self.criteria['content'])
+            if content_ids is not None:
+                candidate_sets.append(content_ids)
+
+        if not candidate_sets:
+            return self._filter_documents(self._indexed_documents_in_order(), self.criteria)
+
+        candidate_ids = intersect_postings(candidate_sets)
+        candidates = [self.indexed_documents[document_id] for document_id in sorted(candidate_ids)]
+        remaining_criteria = {
+            key: value for key, value in self.criteria.items()
+            if key == 'status' or (key == 'content' and self.mode == self.SUBSTRING_MODE)
+        }
+        return self._filter_documents(candidates, remaining_criteria)
+
+    def _indexed_documents_in_order(self) -> List[Document]:
+        """
+        Get all indexed documents ordered by id.
+        """
+
+        return [self.indexed_documents[document_id] for document_id in sorted(self.indexed_documents)]
+
+    def _matches_text(self, query: str, text: str) -> bool:
+        """
+        Check whether the text matches the query according to the search mode.
+        """
+
+        if self.mode == self.SUBSTRING_MODE:
+            return query.lower() in text.lower()
+
+        return tokenize(query) <= tokenize(text)
+
+    def _filter_documents(self, documents: List[Document], criteria: Dict[str, str]) -> List[Document]:
+        """
+        Filter documents by scanning them against the criteria.
+        """
+
+        results = documents
+
+        if 'title' in criteria:
+            title_query = criteria['title'].lower()
+            results = [doc for doc in results if title_query in doc.title.lower()]
+
+        if 'author' in criteria:
+            author_name = criteria['author'].lower()
             results = [doc for doc in results if
                        hasattr(doc.author, 'username') and author_name in doc.author.username.lower()]
 
-        if 'content' in self.criteria:
-            content_query = self.criteria['content'].lower()
-            results = [doc for doc in results if content_query in doc.content.lower()]
+        if 'content' in criteria:
+            content_query = criteria['content']
+            results = [doc for doc in results if self._matches_text(content_query, doc.content)]
 
-        if 'status' in self.criteria:
-            status = self.criteria['status']
+        if 'status' in criteria:
+            status = criteria['status']
             if isinstance(status, str):
                 status = DocumentStatusEnum[status.upper()]
             results = [doc for doc in results if doc.status == status]
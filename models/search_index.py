@@ -0,0 +1,170 @@
+import re
+from typing import Iterable, Optional, Set
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Splits text into a set of lowercased word tokens.
+    """
+    if not text:
+        return set()
+
+    return {match.group().lower() for match in TOKEN_PATTERN.finditer(text)}
+
+
+def intersect_postings(posting_lists: Iterable[Set[int]]) -> Set[int]:
+    """
+    Intersects posting lists starting from the shortest one.
+    """
+    ordered_postings = sorted(posting_lists, key=len)
+    if not ordered_postings:
+        return set()
+
+    result = set(ordered_postings[0])
+    for postings in ordered_postings[1:]:
+        if not result:
+            break
+        result.intersection_update(postings)
+
+    return result
+
+
+class InvertedIndex:
+    """
+    Incrementally maintained mapping of terms to the ids of documents containing them.
+    """
+
+    def __init__(self):
+        self.postings = {}  # {term: set(document_ids)}
+        self.document_terms = {}  # {document_id: set(terms)}
+
+    def add(self, document_id: int, text: str) -> None:
+        """
+        Indexes the text of a document, replacing any previously indexed text.
+        """
+        new_terms = tokenize(text)
+        old_terms = self.document_terms.get(document_id, set())
+
+        for term in old_terms - new_terms:
+            self._discard_posting(term, document_id)
+
+        for term in new_terms - old_terms:
+            if term not in self.postings:
+                self.postings[term] = set()
+            self.postings[term].add(document_id)
+
+        self.document_terms[document_id] = new_terms
+
+    def remove(self, document_id: int) -> None:
+        """
+        Removes a document from the index.
+        """
+        for term in self.document_terms.pop(document_id, set()):
+            self._discard_posting(term, document_id)
+
+    def lookup(self, query: str) -> Optional[Set[int]]:
+        """
+        Returns the ids of documents containing every term of the query.
+        None means the query has no terms and does not restrict the result.
+        """
+        if not query:
+            return None
+
+        terms = tokenize(query)
+        if not terms or any(term not in self.postings for term in terms):
+            return set()
+
+        return intersect_postings(self.postings[term] for term in terms)
+
+    def _discard_posting(self, term: str, document_id: int) -> None:
+        """
+        Removes a document id from the posting list of a term, dropping empty lists.
+        """
+        postings = self.postings.get(term)
+        if postings is None:
+            return
+
+        postings.discard(document_id)
+        if not postings:
+            del self.postings[term]
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Returns the set of three-character substrings of the text.
+    """
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Substring index mapping trigrams to the keys of the texts containing them.
+    """
+
+    def __init__(self):
+        self.postings = {}  # {trigram: set(keys)}
+        self.texts = {}  # {key: lowercased text}
+
+    def add(self, key: int, text: str) -> None:
+        """
+        Indexes a text under the given key, replacing any previously indexed text.
+        """
+        new_text = text.lower()
+        old_text = self.texts.get(key)
+        if old_text == new_text:
+            return
+
+        old_trigrams = trigrams(old_text) if old_text is not None else set()
+        new_trigrams = trigrams(new_text)
+
+        for trigram in old_trigrams - new_trigrams:
+            self._discard_posting(trigram, key)
+
+        for trigram in new_trigrams - old_trigrams:
+            if trigram not in self.postings:
+                self.postings[trigram] = set()
+            self.postings[trigram].add(key)
+
+        self.texts[key] = new_text
+
+    def remove(self, key: int) -> None:
+        """
+        Removes a key from the index.
+        """
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+
+        for trigram in trigrams(text):
+            self._discard_posting(trigram, key)
+
+    def search(self, query: str) -> Set[int]:
+        """
+        Returns the keys whose text contains the query as a case-insensitive substring.
+        Queries shorter than a trigram are verified against every indexed text.
+        """
+        query = query.lower()
+        query_trigrams = trigrams(query)
+
+        if not query_trigrams:
+            return {key for key, text in self.texts.items() if query in text}
+
+        if any(trigram not in self.postings for trigram in query_trigrams):
+            return set()
+
+        candidates = intersect_postings(self.postings[trigram] for trigram in query_trigrams)
+        return {key for key in candidates if query in self.texts[key]}
+
+    def _discard_posting(self, trigram: str, key: int) -> None:
+        """
+        Removes a key from the posting list of a trigram, dropping empty lists.
+        """
+        postings = self.postings.get(trigram)
+        if postings is None:
+            return
+
+        postings.discard(key)
+        if not postings:
+            del self.postings[trigram]
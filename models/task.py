@@ -15,13 +15,14 @@ class Task:
         self.deadline = deadline
         self.status = TaskStatusEnum.PENDING
 
-    def _get_task_id(self) -> int:
+    @classmethod
+    def _get_task_id(cls) -> int:
         """
         Get a unique task ID from class variable.
         """
 
-        self.global_task_id += 1
-        return self.global_task_id
+        cls.global_task_id += 1
+        return cls.global_task_id
 
     @classmethod
     def create_task(cls, document: Document, assignee: User, deadline: datetime) -> "Task":
@@ -1,8 +1,40 @@
-from typing import Union
+from typing import Dict, Iterator, TYPE_CHECKING, Union
 
 from enums import PositionEnum, AccessLevelEnum
 from models.department import Department
 
+if TYPE_CHECKING:
+    from models.document import Document
+
+
+class UserDocumentsView:
+    """
+    Read-only view of the documents of a user, in the order they were added.
+    Membership checks look the document up by id instead of scanning the documents.
+    """
+
+    __slots__ = ("_documents",)
+
+    def __init__(self, documents: Dict[int, 'Document']) -> None:
+        self._documents = documents
+
+    def __iter__(self) -> Iterator['Document']:
+        return iter(self._documents.values())
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, document: 'Document') -> bool:
+        return self._documents.get(getattr(document, 'id', None)) is document
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, UserDocumentsView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"UserDocumentsView({list(self)!r})"
+
 
 class User:
     global_user_id = 0
@@ -21,15 +53,38 @@ class User:
         self.position = position.value
         self.department = department
         self.access_level = access_level
-        self.documents = list()
+        self._documents = {}  # {document.id: document}, in the order the documents were added
 
-    def _get_user_id(self) -> int:
+    @classmethod
+    def _get_user_id(cls) -> int:
         """
         Get a unique user ID from class variable.
         """
 
-        self.global_user_id += 1
-        return self.global_user_id
+        cls.global_user_id += 1
+        return cls.global_user_id
+
+    @property
+    def documents(self) -> UserDocumentsView:
+        """
+        Read-only view of the documents the user has been given access to.
+        """
+
+        return UserDocumentsView(self._documents)
+
+    def add_document(self, document: 'Document') -> None:
+        """
+        Add a document to the user's documents, keeping its position if it was already added.
+        """
+
+        self._documents[document.id] = document
+
+    def remove_document(self, document: 'Document') -> None:
+        """
+        Remove a document from the user's documents.
+        """
+
+        self._documents.pop(document.id, None)
 
     def authenticate(self, password: str) -> bool:
         """
@@ -19,13 +19,14 @@ class Workflow:
         self.current_step_index = 0
         self.status = WorkflowStatusEnum.IN_PROGRESS
 
-    def _get_workflow_id(self) -> int:
+    @classmethod
+    def _get_workflow_id(cls) -> int:
         """
         Get a unique workflow ID from class variable.
         """
 
-        self.global_workflow_id += 1
-        return self.global_workflow_id
+        cls.global_workflow_id += 1
+        return cls.global_workflow_id
 
     def create_route(self, workflow_steps: List[Dict]) -> None:
         """
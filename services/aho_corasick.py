@@ -0,0 +1,71 @@
+from collections import deque
+from typing import Iterable, Set
+
+
+class AhoCorasickAutomaton:
+    """
+    Matches a fixed set of patterns against a text in a single pass over the text.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.transitions = [{}]  # [{character: state}], state 0 is the root
+        self.failure_links = [0]  # [state]
+        self.outputs = [set()]  # [set(patterns)] ending at each state
+
+        for pattern in patterns:
+            self._add_pattern(pattern)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str) -> None:
+        """
+        Adds a pattern to the trie.
+        """
+        if not pattern:
+            return
+
+        state = 0
+        for character in pattern:
+            next_state = self.transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.failure_links.append(0)
+                self.outputs.append(set())
+                self.transitions[state][character] = next_state
+            state = next_state
+
+        self.outputs[state].add(pattern)
+
+    def _build_failure_links(self) -> None:
+        """
+        Computes failure links breadth-first and merges the outputs reachable through them.
+        """
+        queue = deque(self.transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self.transitions[state].items():
+                queue.append(next_state)
+
+                fallback = self.failure_links[state]
+                while fallback and character not in self.transitions[fallback]:
+                    fallback = self.failure_links[fallback]
+
+                target = self.transitions[fallback].get(character, 0)
+                self.failure_links[next_state] = target if target != next_state else 0
+                self.outputs[next_state] |= self.outputs[self.failure_links[next_state]]
+
+    def find_patterns(self, text: str) -> Set[str]:
+        """
+        Returns the distinct patterns occurring in the text.
+        """
+        found = set()
+        state = 0
+
+        for character in text:
+            while state and character not in self.transitions[state]:
+                state = self.failure_links[state]
+            state = self.transitions[state].get(character, 0)
+            found |= self.outputs[state]
+
+        return found
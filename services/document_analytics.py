@@ -1,8 +1,56 @@
+import hashlib
+import heapq
+import math
+import os
+import random
 import re
-from typing import Set, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, repeat
+from typing import Dict, Iterable, Iterator, Set, List, Optional, TextIO, Tuple, Union
 from collections import Counter
 
 from models.document import Document
+from .aho_corasick import AhoCorasickAutomaton
+
+
+MINHASH_PRIME = (1 << 61) - 1
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def iter_words(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Yields lowercased words from text chunks, joining words split across chunk boundaries.
+    """
+
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk if carry else chunk
+        carry = ''
+        for match in WORD_PATTERN.finditer(text):
+            if match.end() == len(text):
+                carry = match.group()
+                break
+            yield match.group().lower()
+
+    if carry:
+        yield carry.lower()
+
+
+def extract_keywords(content: Union[str, Iterable[str]], min_word_length: int, max_keywords: int) -> Set[str]:
+    """
+    Extracts the most frequent words of the content, given as a string or as text chunks, as keywords.
+    Words are counted as they are matched, so no lowercased or split copy of the content is built.
+    Defined at module level so it can run in worker processes.
+    """
+
+    if not content:
+        return set()
+
+    chunks = (content,) if isinstance(content, str) else content
+    word_freq = Counter(word for word in iter_words(chunks) if len(word) >= min_word_length)
+
+    return {word for word, _ in word_freq.most_common(max_keywords)}
 
 
 class DocumentAnalytics:
@@ -13,6 +61,13 @@ class DocumentAnalytics:
         self.min_word_length = 3
         self.max_keywords = 10
         self.similarity_threshold = 0.8
+        self.parallel_batch_threshold = 64  # smaller batches are analyzed in-process
+
+        # MinHash signatures split into LSH bands, so duplicate lookups only compare bucket candidates
+        self.document_signatures = {}  # {document_id: signature}
+        self.lsh_buckets = []  # [{band_values: set(document_ids)}], one dict per band
+        self.minhash_seed = 42
+        self.configure_lsh(bands=16, rows=4)
 
         self.category_keywords = {
             'Financial': ['budget', 'finance', 'money', 'payment', 'expense', 'profit', 'cost'],
@@ -21,18 +76,82 @@ class DocumentAnalytics:
             'Legal': ['contract', 'agreement', 'law', 'legal', 'obligation', 'compliance'],
             'Marketing': ['advertising', 'marketing', 'sales', 'client', 'market', 'promotion']
         }
+        self.category_automaton = None
+        self.pattern_categories = {}  # {category_word: [categories]}
+        self._compile_categories()
 
     def analyze_document(self, document: Document) -> Set[str]:
         """
         Analyzes the document to extract keywords and categorize it.
         """
-        if not document or not document.content:
+        if not document:
+            return set()
+
+        if not document.content:
+            self.remove_document(document.id)
             return set()
 
         keywords = self._extract_keywords(document.content)
+        self._store_analysis(document, keywords)
+
+        return keywords
+
+    def analyze_document_stream(self, document: Document, stream: TextIO, chunk_size: int = 1 << 16) -> Set[str]:
+        """
+        Analyzes a document whose content is read from a text stream in chunks,
+        so peak memory does not depend on the size of the content.
+        An empty stream removes the document from the analytics, like empty content does.
+        """
+        chunks = iter(partial(stream.read, chunk_size), '')
+        first_chunk = next(chunks, '')
+        if not first_chunk:
+            self.remove_document(document.id)
+            return set()
+
+        keywords = self._extract_keywords(chain((first_chunk,), chunks))
+        self._store_analysis(document, keywords)
+        return keywords
+
+    def analyze_documents(self, documents: List[Document], max_workers: Optional[int] = None) -> Dict[int, Set[str]]:
+        """
+        Analyzes a batch of documents, extracting keywords in a process pool and merging the results.
+        """
+        documents = [document for document in documents if document and document.content]
+        contents = [document.content for document in documents]
+
+        if len(documents) < self.parallel_batch_threshold or max_workers == 1:
+            extracted = [self._extract_keywords(content) for content in contents]
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                extracted = list(executor.map(
+                    extract_keywords,
+                    contents,
+                    repeat(self.min_word_length),
+                    repeat(self.max_keywords),
+                    chunksize=max(1, len(contents) // (workers * 4)),
+                ))
+
+        results = {}
+        for document, keywords in zip(documents, extracted):
+            self._store_analysis(document, keywords)
+            results[document.id] = keywords
+
+        return results
+
+    def _store_analysis(self, document: Document, keywords: Set[str]) -> None:
+        """
+        Records the keywords of a document in the indexes and categorizes it.
+        Keywords from a previous analysis that no longer apply are removed from the index.
+        """
+        old_keywords = self.document_keywords.get(document.id, set())
         self.document_keywords[document.id] = keywords
+        self._index_signature(document.id, keywords)
 
-        for keyword in keywords:
+        for keyword in old_keywords - keywords:
+            self._discard_keyword_posting(keyword, document.id)
+
+        for keyword in keywords - old_keywords:
             if keyword not in self.keyword_index:
                 self.keyword_index[keyword] = set()
             self.keyword_index[keyword].add(document.id)
@@ -42,22 +161,64 @@ class DocumentAnalytics:
 
         document.add_history_entry(f"Document analyzed and classified as '{category}'")
 
-        return keywords
+    def remove_document(self, document_id: int) -> None:
+        """
+        Removes a document from all analytics structures.
+        """
+        keywords = self.document_keywords.pop(document_id, None)
+        if keywords is None:
+            return
+
+        self._unindex_signature(document_id)
+        for keyword in keywords:
+            self._discard_keyword_posting(keyword, document_id)
+
+        self.document_categories.pop(document_id, None)
 
-    def _extract_keywords(self, content: str) -> Set[str]:
+    def _discard_keyword_posting(self, keyword: str, document_id: int) -> None:
+        """
+        Removes a document from the posting set of a keyword, dropping the keyword once no document uses it.
+        """
+        postings = self.keyword_index.get(keyword)
+        if postings is None:
+            return
+
+        postings.discard(document_id)
+        if not postings:
+            del self.keyword_index[keyword]
+
+    def _extract_keywords(self, content: Union[str, Iterable[str]]) -> Set[str]:
         """
         Extracts keywords from the document content.
         """
 
-        if not content:
-            return set()
+        return extract_keywords(content, self.min_word_length, self.max_keywords)
+
+    def register_categories(self, categories: Dict[str, List[str]], replace: bool = False) -> None:
+        """
+        Registers category keyword tables and recompiles the categorizer.
+        Words are appended to existing categories unless replace is set, which discards the current table.
+        """
 
-        words = re.sub(r'[^\w\s]', ' ', content.lower()).split()
+        if replace:
+            self.category_keywords = {}
 
-        filtered_words = [word for word in words if len(word) >= self.min_word_length]
-        word_freq = Counter(filtered_words)
+        for category, category_words in categories.items():
+            self.category_keywords.setdefault(category, []).extend(category_words)
 
-        return set([word for word, _ in word_freq.most_common(self.max_keywords)])
+        self._compile_categories()
+
+    def _compile_categories(self) -> None:
+        """
+        Compiles the category keyword table into a multi-pattern matcher.
+        """
+
+        self.pattern_categories = {}
+        for category, category_words in self.category_keywords.items():
+            for category_word in category_words:
+                self.pattern_categories.setdefault(category_word, []).append(category)
+
+        self.category_automaton = AhoCorasickAutomaton(self.pattern_categories)
 
     def _categorize_document(self, keywords: Set[str]) -> str:
         """
@@ -67,10 +228,9 @@ class DocumentAnalytics:
         category_scores = {category: 0 for category in self.category_keywords}
 
         for keyword in keywords:
-            for category, category_words in self.category_keywords.items():
-                for category_word in category_words:
-                    if category_word in keyword:
-                        category_scores[category] += 1
+            for category_word in self.category_automaton.find_patterns(keyword):
+                for category in self.pattern_categories[category_word]:
+                    category_scores[category] += 1
 
         max_score = 0
         best_category = "Not Categorized"
@@ -82,25 +242,212 @@ class DocumentAnalytics:
 
         return best_category
 
+    def configure_lsh(self, bands: int, rows: int) -> None:
+        """
+        Sets the number of LSH bands and rows per band and rebuilds the signatures.
+        More bands with fewer rows raise recall; fewer bands with more rows raise precision and speed.
+        """
+
+        if bands <= 0 or rows <= 0:
+            raise ValueError("LSH bands and rows must be positive.")
+
+        self.lsh_bands = bands
+        self.lsh_rows = rows
+
+        generator = random.Random(self.minhash_seed)
+        self.minhash_parameters = [
+            (generator.randrange(1, MINHASH_PRIME), generator.randrange(0, MINHASH_PRIME))
+            for _ in range(bands * rows)
+        ]
+
+        self.document_signatures = {}
+        self.lsh_buckets = [{} for _ in range(bands)]
+        for document_id, keywords in self.document_keywords.items():
+            self._index_signature(document_id, keywords)
+
+    def _compute_signature(self, keywords: Set[str]) -> Optional[Tuple[int, ...]]:
+        """
+        Computes the MinHash signature of a keyword set.
+        """
+
+        if not keywords:
+            return None
+
+        keyword_hashes = [
+            int.from_bytes(hashlib.blake2b(keyword.encode(), digest_size=8).digest(), 'big')
+            for keyword in keywords
+        ]
+        return tuple(
+            min((a * keyword_hash + b) % MINHASH_PRIME for keyword_hash in keyword_hashes)
+            for a, b in self.minhash_parameters
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """
+        Splits a signature into one bucket key per LSH band.
+        """
+
+        rows = self.lsh_rows
+        return [signature[band * rows:(band + 1) * rows] for band in range(self.lsh_bands)]
+
+    def _index_signature(self, document_id: int, keywords: Set[str]) -> None:
+        """
+        Stores the MinHash signature of a document and places it into the LSH buckets.
+        """
+
+        self._unindex_signature(document_id)
+
+        signature = self._compute_signature(keywords)
+        if signature is None:
+            return
+
+        self.document_signatures[document_id] = signature
+        for buckets, band_key in zip(self.lsh_buckets, self._band_keys(signature)):
+            if band_key not in buckets:
+                buckets[band_key] = set()
+            buckets[band_key].add(document_id)
+
+    def _unindex_signature(self, document_id: int) -> None:
+        """
+        Removes the MinHash signature of a document from the LSH buckets.
+        """
+
+        signature = self.document_signatures.pop(document_id, None)
+        if signature is None:
+            return
+
+        for buckets, band_key in zip(self.lsh_buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                continue
+            bucket.discard(document_id)
+            if not bucket:
+                del buckets[band_key]
+
+    def _duplicate_candidates(self, document_id: int) -> Set[int]:
+        """
+        Collects the documents sharing at least one LSH bucket with the document.
+        """
+
+        signature = self.document_signatures.get(document_id)
+        if signature is None:
+            return set()
+
+        candidates = set()
+        for buckets, band_key in zip(self.lsh_buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+
+        candidates.discard(document_id)
+        return candidates
+
     def find_duplicates(self, document: Document) -> List[int]:
         """
         Finds duplicate documents based on the analyzed keywords.
+        Only LSH bucket candidates are compared with exact Jaccard similarity.
         """
 
         if document.id not in self.document_keywords:
             self.analyze_document(document)
 
-        document_keywords = self.document_keywords[document.id]
         duplicates = []
 
+        for doc_id in sorted(self._duplicate_candidates(document.id)):
+            if self._keyword_similarity(document.id, doc_id) >= self.similarity_threshold:
+                duplicates.append(doc_id)
+
+        return duplicates
+
+    def _keyword_similarity(self, first_id: int, second_id: int) -> float:
+        """
+        Computes the exact Jaccard similarity of two analyzed documents from their keyword sets.
+        """
+
+        first_keywords = self.document_keywords[first_id]
+        second_keywords = self.document_keywords[second_id]
+        intersection = len(first_keywords & second_keywords)
+        union = len(first_keywords) + len(second_keywords) - intersection
+        if union == 0:
+            return 0.0
+        return intersection / union
+
+    def jaccard_scores(self, document: Document) -> Dict[int, float]:
+        """
+        Computes exact Jaccard similarity of a document against every other analyzed document.
+        Documents without any shared keyword are omitted.
+        """
+
+        return self.batch_jaccard_scores([document]).get(document.id, {})
+
+    def batch_jaccard_scores(self, documents: List[Document]) -> Dict[int, Dict[int, float]]:
+        """
+        Computes exact Jaccard scores for a block of documents against every other analyzed document.
+        The keywords of the block are inverted first, so the posting set of each keyword in the
+        keyword index is scanned once per block rather than once per document, and the scores are
+        derived from the shared keyword counts and the keyword set sizes.
+        Documents without any shared keyword are omitted.
+        """
+
+        for document in documents:
+            if document.id not in self.document_keywords:
+                self.analyze_document(document)
+
+        block_ids = list(dict.fromkeys(
+            document.id for document in documents if document.id in self.document_keywords
+        ))
+        block_postings = {}  # {keyword: [block rows]}
+        for row, document_id in enumerate(block_ids):
+            for keyword in self.document_keywords[document_id]:
+                block_postings.setdefault(keyword, []).append(row)
+
+        intersections = [{} for _ in block_ids]  # [{document_id: shared keyword count}], one dict per block row
+        for keyword, rows in block_postings.items():
+            for doc_id in self.keyword_index[keyword]:
+                for row in rows:
+                    counts = intersections[row]
+                    counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        scores = {}
+        for document_id, counts in zip(block_ids, intersections):
+            size = len(self.document_keywords[document_id])
+            counts.pop(document_id, None)
+            scores[document_id] = {
+                doc_id: intersection / (size + len(self.document_keywords[doc_id]) - intersection)
+                for doc_id, intersection in counts.items()
+            }
+
+        return scores
+
+    def find_duplicate_pairs(self, threshold: Optional[float] = None) -> List[Tuple[int, int, float]]:
+        """
+        Finds every pair of analyzed documents whose exact Jaccard similarity reaches the threshold.
+        Candidates come from prefix filtering over rare keywords and are verified with keyword sets.
+        """
+
+        if threshold is None:
+            threshold = self.similarity_threshold
+
+        prefix_index = {}  # {keyword: [document_ids]}
+        pairs = []
+
         for doc_id, keywords in self.document_keywords.items():
-            if doc_id != document.id:
-                similarity = len(document_keywords.intersection(keywords)) / len(document_keywords.union(keywords))
+            if not keywords:
+                continue
 
-                if similarity >= self.similarity_threshold:
-                    duplicates.append(doc_id)
+            # Sets with Jaccard >= threshold share a keyword among their rarest |x| - ceil(t * |x|) + 1 keywords
+            ordered_keywords = sorted(keywords, key=lambda keyword: (len(self.keyword_index[keyword]), keyword))
+            prefix_length = len(keywords) - math.ceil(threshold * len(keywords)) + 1
 
-        return duplicates
+            candidates = set()
+            for keyword in ordered_keywords[:prefix_length]:
+                candidates.update(prefix_index.get(keyword, ()))
+                prefix_index.setdefault(keyword, []).append(doc_id)
+
+            for candidate_id in sorted(candidates):
+                similarity = self._keyword_similarity(candidate_id, doc_id)
+                if similarity >= threshold:
+                    pairs.append((candidate_id, doc_id, similarity))
+
+        return pairs
 
     def find_related_documents(self, document: Document) -> List[int]:
         """
@@ -119,3 +466,34 @@ class DocumentAnalytics:
                         related_documents.add(doc_id)
 
         return list(related_documents)
+
+    def find_top_related_documents(
+            self,
+            document: Document,
+            top_k: int = 10,
+            max_document_frequency: float = 0.5,
+            min_skipped_postings: int = 100,
+    ) -> List[Tuple[int, float]]:
+        """
+        Finds the top-k related documents ranked by the summed IDF weight of shared keywords.
+        Keywords present in more than max_document_frequency of the corpus are skipped
+        once their posting list holds at least min_skipped_postings documents.
+        """
+        if document.id not in self.document_keywords:
+            self.analyze_document(document)
+
+        total_documents = len(self.document_keywords)
+        max_postings = max(min_skipped_postings - 1, int(max_document_frequency * total_documents))
+        scores = {}
+
+        for keyword in self.document_keywords.get(document.id, set()):
+            postings = self.keyword_index.get(keyword, ())
+            if not postings or len(postings) > max_postings:
+                continue
+
+            weight = math.log(1 + total_documents / len(postings))
+            for doc_id in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        scores.pop(document.id, None)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
@@ -0,0 +1,229 @@
+import json
+from typing import Dict, Iterator, Optional
+
+from models.document import Document
+from .delta import Delta, apply_delta, compute_delta
+from .packfile import Packfile
+
+
+class PackedBlobs:
+    """
+    Blob records kept in a packfile instead of process memory.
+    Records are encoded as JSON and decoded each time they are read.
+    """
+
+    def __init__(self, packfile: Packfile):
+        self.packfile = packfile
+
+    def __getitem__(self, digest: str) -> Dict:
+        if digest not in self.packfile:
+            raise KeyError(digest)
+        return json.loads(self.packfile.read(digest))
+
+    def __setitem__(self, digest: str, record: Dict) -> None:
+        self.packfile.append(digest, json.dumps(record).encode())
+
+    def __delitem__(self, digest: str) -> None:
+        if digest not in self.packfile:
+            raise KeyError(digest)
+        self.packfile.delete(digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.packfile
+
+    def __iter__(self) -> Iterator[str]:
+        return self.packfile.keys()
+
+    def __len__(self) -> int:
+        return len(self.packfile)
+
+
+class BlobStore:
+    """
+    Content-addressed storage: identical content is stored once and referenced by its digest.
+    Blobs are kept either as full snapshots or as line deltas against a base blob,
+    with a snapshot forced whenever a delta chain would reach keyframe_interval.
+    When a storage path is given, blobs are written to a packfile at that path and read back from disk.
+    """
+
+    def __init__(self, keyframe_interval: int = 16, storage_path: Optional[str] = None):
+        # {digest: {"snapshot": content} | {"base": digest, "delta": delta, "depth": depth}}
+        self.blobs = PackedBlobs(Packfile(storage_path)) if storage_path else {}
+        self.keyframe_interval = keyframe_interval
+        self.references = {}  # {digest: number of versions referencing the blob}
+        # Blobs delta-encoded against each blob, for blobs written since the store was opened
+        # and for blobs passed to index_dependents
+        self.dependents = {}  # {digest: set(digests)}
+
+    @property
+    def packfile(self) -> Optional[Packfile]:
+        """
+        Returns the packfile backing the blobs, or None when they are kept in memory.
+        """
+        return self.blobs.packfile if isinstance(self.blobs, PackedBlobs) else None
+
+    @staticmethod
+    def compute_digest(content: str) -> str:
+        """
+        Computes the digest that addresses a content.
+        """
+        return Document.hash_content(content)
+
+    def put(self, content: str, base_digest: Optional[str] = None, digest: Optional[str] = None) -> str:
+        """
+        Stores a content, as a delta against the base blob when possible, and returns its digest.
+        A digest already computed by the caller can be passed to avoid hashing the content again.
+        """
+        if digest is None:
+            digest = self.compute_digest(content)
+        if digest in self.blobs:
+            return digest
+
+        depth = self.get_depth(base_digest) + 1 if base_digest in self.blobs else self.keyframe_interval
+        if depth < self.keyframe_interval:
+            self.blobs[digest] = {
+                "base": base_digest,
+                "delta": compute_delta(self.get(base_digest), content),
+                "depth": depth,
+            }
+            self._add_dependent(base_digest, digest)
+        else:
+            self.blobs[digest] = {"snapshot": content}
+
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        Returns the content of a blob, applying its delta chain from the nearest snapshot.
+        """
+        deltas = []
+        record = self.blobs[digest]
+        while "snapshot" not in record:
+            deltas.append(record["delta"])
+            record = self.blobs[record["base"]]
+
+        content = record["snapshot"]
+        for delta in reversed(deltas):
+            content = apply_delta(content, delta)
+        return content
+
+    def get_depth(self, digest: str) -> int:
+        """
+        Returns the number of deltas between a blob and its snapshot.
+        """
+        return self.blobs[digest].get("depth", 0)
+
+    def get_base(self, digest: str) -> Optional[str]:
+        """
+        Returns the digest of the blob a delta is encoded against, or None for a snapshot.
+        """
+        return self.blobs[digest].get("base")
+
+    def get_delta(self, digest: str) -> Optional[Delta]:
+        """
+        Returns the delta that rebuilds a blob from its base, or None for a snapshot.
+        """
+        return self.blobs[digest].get("delta")
+
+    def get_record_size(self, digest: str) -> int:
+        """
+        Returns the number of bytes a blob record takes in storage, compressed when it is kept in a packfile.
+        """
+        if self.packfile is not None:
+            return self.packfile.get_record_size(digest)
+        return len(json.dumps(self.blobs[digest]).encode())
+
+    def add_reference(self, digest: str) -> None:
+        """
+        Counts a version referencing a blob.
+        """
+        self.references[digest] = self.references.get(digest, 0) + 1
+
+    def release_reference(self, digest: str) -> None:
+        """
+        Releases a reference to a blob. Unreferenced blobs are kept until they are deleted.
+        """
+        remaining = self.references.get(digest, 0) - 1
+        if remaining > 0:
+            self.references[digest] = remaining
+        else:
+            self.references.pop(digest, None)
+
+    def is_referenced(self, digest: str) -> bool:
+        """
+        Checks whether any version references a blob.
+        """
+        return digest in self.references
+
+    def index_dependents(self, digest: str) -> None:
+        """
+        Registers a stored blob as a dependent of its base.
+        """
+        base_digest = self.get_base(digest)
+        if base_digest is not None:
+            self._add_dependent(base_digest, digest)
+
+    def _add_dependent(self, base_digest: str, digest: str) -> None:
+        if base_digest not in self.dependents:
+            self.dependents[base_digest] = set()
+        self.dependents[base_digest].add(digest)
+
+    def _discard_dependent(self, base_digest: str, digest: str) -> None:
+        dependents = self.dependents.get(base_digest)
+        if dependents is None:
+            return
+
+        dependents.discard(digest)
+        if not dependents:
+            del self.dependents[base_digest]
+
+    def rewrite_as_snapshot(self, digest: str) -> int:
+        """
+        Replaces a delta blob by a full snapshot, so it no longer depends on its base,
+        and returns the number of bytes the rewrite adds to storage. In a packfile the old record
+        keeps its space until the pack is compacted.
+        """
+        base_digest = self.get_base(digest)
+        if base_digest is None:
+            return 0
+
+        size_before = 0 if self.packfile is not None else self.get_record_size(digest)
+        self.blobs[digest] = {"snapshot": self.get(digest)}
+        self._discard_dependent(base_digest, digest)
+        return self.get_record_size(digest) - size_before
+
+    def delete(self, digest: str) -> int:
+        """
+        Deletes a blob and returns the number of bytes freed. Blobs encoded against it must be rewritten
+        as snapshots first. In a packfile the record keeps its space until the pack is compacted.
+        """
+        if self.dependents.get(digest):
+            raise ValueError("Blob is the base of other blobs.")
+
+        freed = 0 if self.packfile is not None else self.get_record_size(digest)
+        base_digest = self.get_base(digest)
+        del self.blobs[digest]
+        self.dependents.pop(digest, None)
+        if base_digest is not None:
+            self._discard_dependent(base_digest, digest)
+        return freed
+
+    def compact(self) -> int:
+        """
+        Compacts the packfile backing the blobs and returns the number of bytes freed.
+        Blobs kept in memory are freed when they are deleted, so there is nothing to compact.
+        """
+        return self.packfile.compact() if self.packfile is not None else 0
+
+    def close(self) -> None:
+        """
+        Closes the packfile backing the blobs, if any.
+        """
+        if self.packfile is not None:
+            self.packfile.close()
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.blobs
+
+    def __len__(self) -> int:
+        return len(self.blobs)
@@ -0,0 +1,42 @@
+from difflib import SequenceMatcher
+from typing import Tuple
+
+COPY = "copy"
+INSERT = "insert"
+
+Delta = Tuple[tuple, ...]  # (("copy", start_line, end_line) | ("insert", text), ...)
+
+
+def compute_delta(base: str, target: str) -> Delta:
+    """
+    Computes a line-level delta that rebuilds the target from the base.
+    Unchanged runs of lines are stored as references into the base.
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, base_lines, target_lines)
+
+    operations = []
+    for tag, base_start, base_end, target_start, target_end in matcher.get_opcodes():
+        if tag == "equal":
+            operations.append((COPY, base_start, base_end))
+        elif tag in ("replace", "insert"):
+            operations.append((INSERT, "".join(target_lines[target_start:target_end])))
+
+    return tuple(operations)
+
+
+def apply_delta(base: str, delta: Delta) -> str:
+    """
+    Rebuilds the target content from the base and a delta.
+    """
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+
+    for operation in delta:
+        if operation[0] == COPY:
+            parts.extend(base_lines[operation[1]:operation[2]])
+        else:
+            parts.append(operation[1])
+
+    return "".join(parts)
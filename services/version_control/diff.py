@@ -0,0 +1,139 @@
+from difflib import SequenceMatcher
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .delta import COPY, Delta
+from .models import DiffHunk
+
+Opcode = Tuple[str, int, int, int, int]  # (tag, from_start, from_end, to_start, to_end) as in difflib
+
+
+def opcodes_from_delta(base_line_count: int, delta: Delta) -> Optional[List[Opcode]]:
+    """
+    Derives difflib-style opcodes from a delta that rebuilds the target from the base,
+    without comparing the contents again. Returns None when the delta copies base lines out of order.
+    """
+    opcodes = []
+    base_position = target_position = 0
+    change_start = (0, 0)
+
+    def flush_change() -> None:
+        from_start, to_start = change_start
+        if base_position > from_start and target_position > to_start:
+            opcodes.append(("replace", from_start, base_position, to_start, target_position))
+        elif base_position > from_start:
+            opcodes.append(("delete", from_start, base_position, to_start, target_position))
+        elif target_position > to_start:
+            opcodes.append(("insert", from_start, base_position, to_start, target_position))
+
+    for operation in delta:
+        if operation[0] == COPY:
+            start, end = operation[1], operation[2]
+            if start < base_position:
+                return None
+
+            base_position = start
+            flush_change()
+            size = end - start
+            if opcodes and opcodes[-1][0] == "equal":
+                _, from_start, _, to_start, _ = opcodes.pop()
+            else:
+                from_start, to_start = start, target_position
+            base_position += size
+            target_position += size
+            opcodes.append(("equal", from_start, base_position, to_start, target_position))
+            change_start = (base_position, target_position)
+        else:
+            target_position += len(operation[1].splitlines(keepends=True))
+
+    base_position = base_line_count
+    flush_change()
+    return opcodes
+
+
+def invert_opcodes(opcodes: Sequence[Opcode]) -> List[Opcode]:
+    """
+    Turns the opcodes of a diff from A to B into the opcodes of the diff from B to A.
+    """
+    inverted_tags = {"insert": "delete", "delete": "insert"}
+    return [
+        (inverted_tags.get(tag, tag), to_start, to_end, from_start, from_end)
+        for tag, from_start, from_end, to_start, to_end in opcodes
+    ]
+
+
+def _group_opcodes(opcodes: List[Opcode], context: int) -> Iterator[List[Opcode]]:
+    """
+    Splits opcodes into hunks separated by more than twice the context of unchanged lines,
+    trimming the unchanged lines around each hunk to the context (as difflib does).
+    """
+    codes = list(opcodes)
+    if codes and codes[0][0] == "equal":
+        tag, from_start, from_end, to_start, to_end = codes[0]
+        codes[0] = tag, max(from_start, from_end - context), from_end, max(to_start, to_end - context), to_end
+    if codes and codes[-1][0] == "equal":
+        tag, from_start, from_end, to_start, to_end = codes[-1]
+        codes[-1] = tag, from_start, min(from_end, from_start + context), to_start, min(to_end, to_start + context)
+
+    group = []
+    for tag, from_start, from_end, to_start, to_end in codes:
+        if tag == "equal" and from_end - from_start > 2 * context:
+            group.append((tag, from_start, min(from_end, from_start + context), to_start,
+                          min(to_end, to_start + context)))
+            yield group
+            group = []
+            from_start, to_start = max(from_start, from_end - context), max(to_start, to_end - context)
+        group.append((tag, from_start, from_end, to_start, to_end))
+
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def compute_hunks(
+        old: str,
+        new: str,
+        context: int = 3,
+        opcodes: Optional[List[Opcode]] = None,
+) -> List[DiffHunk]:
+    """
+    Computes the line-level hunks that turn the old content into the new one.
+    Precomputed opcodes, for example derived from a stored delta, skip the comparison of the contents.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    if opcodes is None:
+        opcodes = SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+
+    hunks = []
+    for group in _group_opcodes(opcodes, context):
+        lines = []
+        for tag, from_start, from_end, to_start, to_end in group:
+            if tag == "equal":
+                lines.extend((" ", line) for line in old_lines[from_start:from_end])
+                continue
+            lines.extend(("-", line) for line in old_lines[from_start:from_end])
+            lines.extend(("+", line) for line in new_lines[to_start:to_end])
+
+        first, last = group[0], group[-1]
+        hunks.append(DiffHunk(
+            from_start=first[1],
+            from_count=last[2] - first[1],
+            to_start=first[3],
+            to_count=last[4] - first[3],
+            lines=lines,
+        ))
+    return hunks
+
+
+def format_unified(hunks: Sequence[DiffHunk], from_label: str, to_label: str) -> str:
+    """
+    Renders hunks as a unified diff.
+    """
+    if not hunks:
+        return ""
+
+    output = [f"--- {from_label}\n", f"+++ {to_label}\n"]
+    for hunk in hunks:
+        output.append(hunk.header + "\n")
+        for marker, line in hunk.lines:
+            output.append(marker + line if line.endswith("\n") else marker + line + "\n\\ No newline at end of file\n")
+    return "".join(output)
@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+from .version_control_system import VersionControl
+
+
+class RetentionPolicy:
+    """
+    Describes which version history the garbage collector may condense or remove.
+    Versions older than max_age are squashed, except the keep_latest newest versions of each branch
+    and versions other branches were created from or merged. Branches whose latest version
+    has been merged into one of the merge_targets are deleted.
+    """
+
+    def __init__(
+            self,
+            max_age: Optional[timedelta] = None,
+            keep_latest: int = 10,
+            delete_merged_branches: bool = True,
+            merge_targets: Tuple[str, ...] = ("main",),
+    ):
+        if keep_latest < 1:
+            raise ValueError("At least the latest version of a branch must be kept.")
+
+        self.max_age = max_age
+        self.keep_latest = keep_latest
+        self.delete_merged_branches = delete_merged_branches
+        self.merge_targets = merge_targets
+
+
+class GarbageCollector:
+    """
+    Incremental garbage collector for version history.
+    A collection cycle deletes merged branches, squashes each run of versions outside the retention
+    policy into a keyframe version, deletes blobs no version references, rewriting blobs encoded
+    against them as keyframes, and finally compacts the blob pack so the freed space is returned.
+    The cycle advances by at most max_work steps per call to collect, so it can be interleaved with
+    normal version control operations; only the compaction rewrites the pack in a single step.
+    """
+
+    def __init__(
+            self,
+            version_control: VersionControl,
+            policy: Optional[RetentionPolicy] = None,
+            max_work: int = 100,
+            clock: Callable[[], datetime] = datetime.now,
+    ):
+        self.version_control = version_control
+        self.policy = policy or RetentionPolicy()
+        self.max_work = max_work
+        self.clock = clock
+        self._cycle = None
+        self._blobs_changed = False  # whether the current cycle left records to compact in the blob pack
+        self._report = self._new_report()
+
+    @staticmethod
+    def _new_report() -> Dict:
+        return {
+            "branches_deleted": 0,
+            "versions_pruned": 0,
+            "keyframes_written": 0,
+            "blobs_deleted": 0,
+            "reclaimed_bytes": 0,
+            "complete": False,
+        }
+
+    def collect(self, max_work: Optional[int] = None) -> Dict:
+        """
+        Advances the current collection cycle by at most max_work steps and reports what was reclaimed.
+        "complete" is True when the call finished a cycle; the next call starts a new one.
+        """
+        self._report = self._new_report()
+        if self._cycle is None:
+            self._cycle = self._run_cycle()
+
+        for _ in range(max_work or self.max_work):
+            if not next(self._cycle, False):
+                self._cycle = None
+                self._report["complete"] = True
+                break
+
+        return self._report
+
+    def run(self) -> Dict:
+        """
+        Runs collection steps until a full cycle has completed and reports the totals.
+        """
+        totals = self._new_report()
+        while not totals["complete"]:
+            report = self.collect()
+            for key, value in report.items():
+                totals[key] = value if key == "complete" else totals[key] + value
+        return totals
+
+    def _run_cycle(self) -> Iterator[bool]:
+        """
+        Performs one collection cycle, yielding after every step.
+        """
+        cutoff = self.clock() - self.policy.max_age if self.policy.max_age is not None else None
+        self._blobs_changed = False
+
+        for document_id in list(self.version_control.documents):
+            if self.policy.delete_merged_branches:
+                yield from self._delete_merged_branches(document_id)
+            if cutoff is not None:
+                yield from self._squash_versions(document_id, cutoff)
+
+        yield from self._delete_unreferenced_blobs()
+        yield from self._compact_blobs()
+
+    def _delete_merged_branches(self, document_id: int) -> Iterator[bool]:
+        """
+        Deletes the branches whose latest version has been merged into a merge target.
+        """
+        for branch_name in list(self.version_control.documents.get(document_id, {})):
+            branches = self.version_control.documents.get(document_id, {})
+            branch = branches.get(branch_name)
+            merged = branch is not None and branch_name not in self.policy.merge_targets and any(
+                branches[target_name].ancestors.get(branch_name, 0) >= branch.head_number
+                for target_name in self.policy.merge_targets if target_name in branches
+            )
+            if merged and self.version_control.delete_branch(document_id, branch_name):
+                self._report["branches_deleted"] += 1
+            yield True
+
+    def _referenced_versions(self, document_id: int) -> Set[Tuple[str, int]]:
+        """
+        Returns the versions other branches of a document were created from or merged,
+        which merge bases may be read from.
+        """
+        return {
+            (branch_name, version_number)
+            for branch in self.version_control.documents.get(document_id, {}).values()
+            for branch_name, version_number in branch.ancestors.items()
+        }
+
+    def _squash_versions(self, document_id: int, cutoff: datetime) -> Iterator[bool]:
+        """
+        Squashes every run of consecutive versions of a branch that are older than the cutoff into the
+        last version of the run. That version keeps its number and date and is stored as a keyframe,
+        so it no longer depends on the pruned versions.
+        """
+        for branch_name in list(self.version_control.documents.get(document_id, {})):
+            branch = self.version_control.documents.get(document_id, {}).get(branch_name)
+            if branch is None:
+                continue
+
+            referenced = self._referenced_versions(document_id)
+            runs = []  # [[version]], runs of consecutive expired versions
+            previous_expired = False
+            for version in branch.versions[:-self.policy.keep_latest]:
+                expired = version.date < cutoff and (branch_name, version.number) not in referenced
+                if expired and not previous_expired:
+                    runs.append([])
+                if expired:
+                    runs[-1].append(version)
+                previous_expired = expired
+            yield True
+
+            for run in runs:
+                for version in run[:-1]:
+                    if self.version_control.prune_version(document_id, branch_name, version.number):
+                        self._report["versions_pruned"] += 1
+                    yield True
+
+                blob_store = self.version_control.blob_store
+                keyframe_digest = run[-1].content_digest
+                if keyframe_digest in blob_store and blob_store.get_base(keyframe_digest) is not None:
+                    self._report["reclaimed_bytes"] -= blob_store.rewrite_as_snapshot(keyframe_digest)
+                    self._report["keyframes_written"] += 1
+                    self._blobs_changed = True
+                yield True
+
+    def _delete_unreferenced_blobs(self) -> Iterator[bool]:
+        """
+        Deletes the blobs no version references. Blobs still in use that are encoded against
+        a deleted blob are rewritten as snapshots first.
+        """
+        blob_store = self.version_control.blob_store
+
+        depths = {}  # {digest: depth} of the blobs unreferenced when they were scanned
+        for digest in list(blob_store.blobs):
+            if digest in blob_store:
+                blob_store.index_dependents(digest)
+                if not blob_store.is_referenced(digest):
+                    depths[digest] = blob_store.get_depth(digest)
+            yield True
+
+        # Deepest blobs go first, so unreferenced dependents are deleted before their bases
+        for digest in sorted(depths, key=depths.get, reverse=True):
+            if digest not in blob_store or blob_store.is_referenced(digest):
+                yield True
+                continue
+
+            for dependent in list(blob_store.dependents.get(digest, ())):
+                if dependent not in blob_store:
+                    continue
+                self._report["reclaimed_bytes"] -= blob_store.rewrite_as_snapshot(dependent)
+                self._report["keyframes_written"] += 1
+                self._blobs_changed = True
+                yield True
+
+            # The blob may have been referenced or used as a base again between steps
+            if blob_store.is_referenced(digest) or blob_store.dependents.get(digest):
+                yield True
+                continue
+
+            self._report["reclaimed_bytes"] += blob_store.delete(digest)
+            self._report["blobs_deleted"] += 1
+            self._blobs_changed = True
+            yield True
+
+    def _compact_blobs(self) -> Iterator[bool]:
+        """
+        Compacts the blob pack, so the space of deleted and rewritten blob records is freed on disk.
+        """
+        if self._blobs_changed:
+            self._report["reclaimed_bytes"] += self.version_control.blob_store.compact()
+        yield True
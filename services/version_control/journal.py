@@ -0,0 +1,43 @@
+import json
+import os
+from typing import Dict, Iterator
+
+
+class Journal:
+    """
+    Append-only file of version metadata records, one JSON object per line.
+    Records are small and stored uncompressed, so replaying the journal is a single sequential read
+    without per-record decompression or index lookups. Replay still visits every record, so restart
+    time grows with the number of journaled changes, but not with the size of the content.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a+", encoding="utf-8")
+
+    def __iter__(self) -> Iterator[Dict]:
+        """
+        Yields the records in the order they were appended. A partially written last record is cut off
+        once the replay reaches it, so the next record does not run into it.
+        """
+        self._file.seek(0)
+        complete_length = 0  # bytes of the journal up to the end of its last complete record
+        for line in self._file:
+            if not line.endswith("\n"):
+                break
+            complete_length += len(line.encode("utf-8"))
+            yield json.loads(line)
+
+        if complete_length < os.path.getsize(self.path):
+            self._file.truncate(complete_length)
+        self._file.seek(0, os.SEEK_END)
+
+    def append(self, record: Dict) -> None:
+        """
+        Appends a record to the journal.
+        """
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
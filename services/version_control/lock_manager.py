@@ -0,0 +1,171 @@
+import heapq
+import threading
+import time
+from itertools import count
+from typing import Callable, Dict, Optional
+
+from enums import LockModeEnum
+
+
+class Lease:
+    """
+    Represents a lock held on a resource until it is released or its lease expires.
+    """
+
+    __slots__ = ("resource_id", "holder_id", "mode", "expires_at")
+
+    def __init__(self, resource_id: int, holder_id: int, mode: LockModeEnum, expires_at: float):
+        self.resource_id = resource_id
+        self.holder_id = holder_id
+        self.mode = mode
+        self.expires_at = expires_at
+
+
+class LockManager:
+    """
+    Thread-safe lock manager granting shared and exclusive leases that expire after a TTL.
+    Expired leases are found through a heap ordered by expiry time, so a sweep only looks at
+    the leases that have actually expired. Lease renewals leave stale heap entries behind,
+    which are skipped when they reach the top.
+    """
+
+    def __init__(self, default_ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.locks = {}  # {resource_id: {holder_id: Lease}}
+        self._expirations = []  # heap of (expires_at, order, resource_id, holder_id)
+        self._order = count()
+        self._condition = threading.Condition()
+
+    def acquire(
+            self,
+            resource_id: int,
+            holder_id: int,
+            mode: LockModeEnum = LockModeEnum.EXCLUSIVE,
+            ttl: Optional[float] = None,
+            timeout: Optional[float] = 0,
+    ) -> Optional[Lease]:
+        """
+        Acquires a lease on a resource, waiting up to timeout seconds for conflicting leases to go away.
+        A timeout of 0 does not wait and None waits indefinitely. A holder acquiring a resource again
+        renews its lease, and may upgrade a shared lease to an exclusive one when it is the only holder.
+        Returns None when the lease could not be acquired in time. The timeout is measured on the same
+        clock as the leases.
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+
+        with self._condition:
+            while True:
+                self._sweep_expired()
+                if self._is_compatible(resource_id, holder_id, mode):
+                    return self._grant(resource_id, holder_id, mode, ttl)
+
+                remaining = None if deadline is None else deadline - self.clock()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(self._wait_time(remaining))
+
+    def renew(self, resource_id: int, holder_id: int, ttl: Optional[float] = None) -> bool:
+        """
+        Extends an unexpired lease by a new TTL.
+        """
+        with self._condition:
+            self._sweep_expired()
+            lease = self.locks.get(resource_id, {}).get(holder_id)
+            if lease is None:
+                return False
+
+            self._grant(resource_id, holder_id, lease.mode, ttl)
+            return True
+
+    def release(self, resource_id: int, holder_id: int) -> bool:
+        """
+        Releases a lease and wakes up callers waiting for the resource.
+        """
+        with self._condition:
+            self._sweep_expired()
+            if self._remove_lease(resource_id, holder_id) is None:
+                return False
+
+            self._condition.notify_all()
+            return True
+
+    def get_leases(self, resource_id: int) -> Dict[int, Lease]:
+        """
+        Returns the unexpired leases on a resource by holder id.
+        """
+        with self._condition:
+            self._sweep_expired()
+            return dict(self.locks.get(resource_id, {}))
+
+    def is_locked(self, resource_id: int, mode: Optional[LockModeEnum] = None) -> bool:
+        """
+        Checks whether a resource has an unexpired lease, optionally in a specific mode.
+        """
+        leases = self.get_leases(resource_id)
+        if mode is None:
+            return bool(leases)
+        return any(lease.mode == mode for lease in leases.values())
+
+    def sweep_expired(self) -> int:
+        """
+        Removes the expired leases and returns how many were removed.
+        """
+        with self._condition:
+            return self._sweep_expired()
+
+    def _is_compatible(self, resource_id: int, holder_id: int, mode: LockModeEnum) -> bool:
+        """
+        Checks whether a holder can take a lease in the given mode next to the current leases.
+        """
+        other_leases = [lease for lease in self.locks.get(resource_id, {}).values() if lease.holder_id != holder_id]
+        if mode == LockModeEnum.EXCLUSIVE:
+            return not other_leases
+        return all(lease.mode == LockModeEnum.SHARED for lease in other_leases)
+
+    def _grant(self, resource_id: int, holder_id: int, mode: LockModeEnum, ttl: Optional[float]) -> Lease:
+        """
+        Creates or refreshes a lease and schedules its expiry.
+        """
+        expires_at = self.clock() + (self.default_ttl if ttl is None else ttl)
+        lease = Lease(resource_id, holder_id, mode, expires_at)
+        self.locks.setdefault(resource_id, {})[holder_id] = lease
+        heapq.heappush(self._expirations, (expires_at, next(self._order), resource_id, holder_id))
+        return lease
+
+    def _remove_lease(self, resource_id: int, holder_id: int) -> Optional[Lease]:
+        leases = self.locks.get(resource_id)
+        if leases is None:
+            return None
+
+        lease = leases.pop(holder_id, None)
+        if not leases:
+            del self.locks[resource_id]
+        return lease
+
+    def _sweep_expired(self) -> int:
+        """
+        Pops expired entries off the heap, removing the leases they still belong to.
+        """
+        now = self.clock()
+        expired = 0
+        while self._expirations and self._expirations[0][0] <= now:
+            expires_at, _, resource_id, holder_id = heapq.heappop(self._expirations)
+            lease = self.locks.get(resource_id, {}).get(holder_id)
+            if lease is not None and lease.expires_at == expires_at:
+                self._remove_lease(resource_id, holder_id)
+                expired += 1
+
+        if expired:
+            self._condition.notify_all()
+        return expired
+
+    def _wait_time(self, remaining: Optional[float]) -> Optional[float]:
+        """
+        Returns how long to wait for a release, waking up when the next lease expires.
+        """
+        if not self._expirations:
+            return remaining
+
+        until_expiry = max(self._expirations[0][0] - self.clock(), 0)
+        return until_expiry if remaining is None else min(remaining, until_expiry)
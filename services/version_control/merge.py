@@ -0,0 +1,92 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from .models import MergeConflict
+
+
+def _matching_lines(base_lines: List[str], other_lines: List[str]) -> Dict[int, int]:
+    """
+    Maps each base line that is kept unchanged in the other version to its index there.
+    """
+    matcher = SequenceMatcher(None, base_lines, other_lines, autojunk=False)
+    mapping = {}
+    for base_start, other_start, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            mapping[base_start + offset] = other_start + offset
+    return mapping
+
+
+def _terminated(lines: List[str]) -> List[str]:
+    """
+    Ensures every line ends with a newline so conflict markers start on their own line.
+    """
+    return [line if line.endswith("\n") else line + "\n" for line in lines]
+
+
+def merge_three_way(
+        base: str,
+        source: str,
+        target: str,
+        source_label: str = "source",
+        target_label: str = "target",
+) -> Tuple[str, List[MergeConflict]]:
+    """
+    Merges source and target changes relative to their common base line by line (diff3).
+    Regions changed on only one side are applied automatically; regions changed on both sides
+    differently are reported as conflicts and written with conflict markers.
+    """
+    base_lines = base.splitlines(keepends=True)
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    source_matches = _matching_lines(base_lines, source_lines)
+    target_matches = _matching_lines(base_lines, target_lines)
+
+    merged = []
+    conflicts = []
+    base_index = source_index = target_index = 0
+
+    while True:
+        # Copy lines left unchanged by both sides
+        while (base_index < len(base_lines)
+               and source_matches.get(base_index) == source_index
+               and target_matches.get(base_index) == target_index):
+            merged.append(base_lines[base_index])
+            base_index += 1
+            source_index += 1
+            target_index += 1
+
+        next_base = base_index
+        while next_base < len(base_lines) and not (next_base in source_matches and next_base in target_matches):
+            next_base += 1
+
+        if next_base < len(base_lines):
+            source_end = source_matches[next_base]
+            target_end = target_matches[next_base]
+        else:
+            source_end = len(source_lines)
+            target_end = len(target_lines)
+
+        if next_base == base_index and source_end == source_index and target_end == target_index:
+            break
+
+        base_chunk = base_lines[base_index:next_base]
+        source_chunk = source_lines[source_index:source_end]
+        target_chunk = target_lines[target_index:target_end]
+
+        if source_chunk == target_chunk or target_chunk == base_chunk:
+            merged.extend(source_chunk)
+        elif source_chunk == base_chunk:
+            merged.extend(target_chunk)
+        else:
+            conflicts.append(MergeConflict(len(merged) + 1, base_chunk, source_chunk, target_chunk))
+            if merged and not merged[-1].endswith("\n"):
+                merged[-1] += "\n"
+            merged.append(f"<<<<<<< {target_label}\n")
+            merged.extend(_terminated(target_chunk))
+            merged.append("=======\n")
+            merged.extend(_terminated(source_chunk))
+            merged.append(f">>>>>>> {source_label}\n")
+
+        base_index, source_index, target_index = next_base, source_end, target_end
+
+    return "".join(merged), conflicts
@@ -1 +1,4 @@
 from .branch import Branch
+from .diff_hunk import DiffHunk
+from .merge_conflict import MergeConflict
+from .version import Version
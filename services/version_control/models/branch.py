@@ -1,4 +1,7 @@
-from typing import Optional
+from bisect import bisect_left
+from typing import Dict, Optional
+
+from .version import Version
 
 
 class Branch:
@@ -6,7 +9,67 @@ class Branch:
     Represents a branch in the version control system.
     """
 
-    def __init__(self, name: str, parent_branch_name: Optional[str] = None):
+    __slots__ = ("name", "parent_branch_name", "parent_version", "versions", "ancestors")
+
+    def __init__(
+            self,
+            name: str,
+            parent_branch_name: Optional[str] = None,
+            parent_version: Optional[int] = None,
+            ancestors: Optional[Dict[str, int]] = None,
+    ):
         self.name = name
         self.parent_branch_name = parent_branch_name
+        self.parent_version = parent_version
         self.versions = []  # list of versions in this branch
+        # Newest version of every other branch contained in this branch: {branch_name: version_number}
+        self.ancestors = ancestors if ancestors is not None else {}
+
+    @property
+    def head(self) -> Optional[Version]:
+        """
+        Returns the latest version of the branch.
+        """
+        return self.versions[-1] if self.versions else None
+
+    @property
+    def version_count(self) -> int:
+        """
+        Returns the number of versions kept in the branch.
+        """
+        return len(self.versions)
+
+    @property
+    def head_number(self) -> int:
+        """
+        Returns the number of the latest version, which keeps counting when older versions are pruned.
+        """
+        return self.versions[-1].number if self.versions else 0
+
+    def get_version(self, version_number: int) -> Optional[Version]:
+        """
+        Returns a version by its number, or None if the branch has no such version.
+        """
+        if version_number <= 0 or version_number > self.head_number:
+            return None
+        if len(self.versions) == self.head_number:
+            return self.versions[version_number - 1]
+
+        index = bisect_left(self.versions, version_number, key=lambda version: version.number)
+        return self.versions[index] if self.versions[index].number == version_number else None
+
+    def append_version(self, version: Version) -> None:
+        """
+        Adds a new head version to the branch.
+        """
+        self.versions.append(version)
+
+    def remove_version(self, version_number: int) -> Optional[Version]:
+        """
+        Removes a version that is not the head and returns it, or None if it cannot be removed.
+        """
+        version = self.get_version(version_number)
+        if version is None or version is self.head:
+            return None
+        self.versions.remove(version)
+        return version
@@ -0,0 +1,47 @@
+from typing import Any, Iterable, Tuple
+
+
+class DiffHunk:
+    """
+    Represents a region that differs between two versions, together with its surrounding context lines.
+    Hunks are immutable, so cached diffs can be handed out to every caller.
+    """
+
+    __slots__ = ("from_start", "from_count", "to_start", "to_count", "lines")
+
+    def __init__(
+            self,
+            from_start: int,
+            from_count: int,
+            to_start: int,
+            to_count: int,
+            lines: Iterable[Tuple[str, str]],
+    ):
+        object.__setattr__(self, "from_start", from_start)  # index of the first line of the hunk in the old version
+        object.__setattr__(self, "from_count", from_count)
+        object.__setattr__(self, "to_start", to_start)  # index of the first line of the hunk in the new version
+        object.__setattr__(self, "to_count", to_count)
+        object.__setattr__(self, "lines", tuple(lines))  # ((" " | "-" | "+", line),)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    @property
+    def header(self) -> str:
+        """
+        Returns the unified diff header of the hunk, for example "@@ -3,4 +3,5 @@".
+        """
+        return f"@@ -{self._format_range(self.from_start, self.from_count)} " \
+               f"+{self._format_range(self.to_start, self.to_count)} @@"
+
+    @staticmethod
+    def _format_range(start: int, count: int) -> str:
+        # Unified diffs number lines from 1 and name the line before an empty range
+        if count == 1:
+            return str(start + 1)
+        if count == 0:
+            return f"{start},0"
+        return f"{start + 1},{count}"
@@ -0,0 +1,31 @@
+from typing import Any, Dict, List
+
+
+class MergeConflict:
+    """
+    Represents a region changed differently in both branches since their common ancestor.
+    """
+
+    def __init__(self, line_number: int, base_lines: List[str], source_lines: List[str], target_lines: List[str]):
+        self.line_number = line_number  # first line of the conflict markers in the merged content
+        self.base_lines = base_lines
+        self.source_lines = source_lines
+        self.target_lines = target_lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the conflict as a dictionary, for example to persist a pending merge.
+        """
+        return {
+            "line_number": self.line_number,
+            "base_lines": self.base_lines,
+            "source_lines": self.source_lines,
+            "target_lines": self.target_lines,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MergeConflict":
+        """
+        Restores a conflict from the dictionary returned by to_dict.
+        """
+        return cls(data["line_number"], data["base_lines"], data["source_lines"], data["target_lines"])
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models.user import User
+
+
+class Version:
+    """
+    Represents a single version of a document in a branch.
+    """
+
+    __slots__ = (
+        "number",
+        "content_digest",
+        "sequence",
+        "date",
+        "author",
+        "description",
+        "parent_branch",
+        "parent_version",
+        "merged_from",
+        "merged_version",
+        "conflict_resolution",
+    )
+
+    def __init__(
+            self,
+            number: int,
+            content_digest: str,
+            sequence: int,
+            date: datetime,
+            author: User,
+            description: Optional[str] = None,
+            parent_branch: Optional[str] = None,
+            parent_version: Optional[int] = None,
+            merged_from: Optional[str] = None,
+            merged_version: Optional[int] = None,
+            conflict_resolution: bool = False,
+    ):
+        self.number = number
+        self.content_digest = content_digest
+        self.sequence = sequence  # global creation order, used to pick the latest merge base
+        self.date = date
+        self.author = author
+        self.description = description
+        self.parent_branch = parent_branch
+        self.parent_version = parent_version
+        self.merged_from = merged_from
+        self.merged_version = merged_version
+        self.conflict_resolution = conflict_resolution
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the version metadata as a history entry, omitting fields that are not set.
+        """
+        entry = {
+            "version": self.number,
+            "content_digest": self.content_digest,
+            "date": self.date,
+            "author": self.author,
+        }
+        if self.description is not None:
+            entry["description"] = self.description
+        if self.parent_branch is not None:
+            entry["parent_branch"] = self.parent_branch
+            entry["parent_version"] = self.parent_version
+        if self.merged_from is not None:
+            entry["merged_from"] = self.merged_from
+            entry["merged_version"] = self.merged_version
+        if self.conflict_resolution:
+            entry["conflict_resolution"] = True
+        return entry
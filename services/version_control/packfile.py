@@ -0,0 +1,198 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterator
+
+RECORD_HEADER = struct.Struct(">HI")  # (key length, compressed payload length)
+
+
+class Packfile:
+    """
+    Append-only file of zlib-compressed records addressed by string keys.
+    Records are written to the pack and their positions to a separate index file,
+    so reopening a pack only reads the index; the pack itself is memory-mapped
+    and a record is paged in when it is read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.offsets = {}  # {key: (payload offset, payload length)}; deleted keys are written with offset -1
+        self._pack = open(path, "a+b")
+        self._index = open(self.index_path, "a+")
+        self._map = None
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """
+        Reads the record positions from the index file and recovers records
+        appended to the pack after the last complete index entry. A partially written
+        last entry is cut off, so the next entry does not run into it.
+        """
+        self._index.seek(0)
+        indexed_end = 0
+        complete_length = 0  # bytes of the index up to the end of its last complete entry
+        for line in self._index:
+            if not line.endswith("\n"):
+                break
+            complete_length += len(line.encode(self._index.encoding))
+            key, offset, length = line.rstrip("\n").rsplit("\t", 2)
+            if int(offset) < 0:
+                self.offsets.pop(key, None)
+                continue
+            self.offsets[key] = (int(offset), int(length))
+            indexed_end = max(indexed_end, int(offset) + int(length))
+
+        if complete_length < os.path.getsize(self.index_path):
+            self._index.truncate(complete_length)
+
+        pack_size = os.path.getsize(self.path)
+        if pack_size > indexed_end:
+            self._recover(indexed_end, pack_size)
+
+        self._index.seek(0, os.SEEK_END)
+
+    def _recover(self, position: int, pack_size: int) -> None:
+        """
+        Scans records missing from the index and truncates a partially written tail.
+        """
+        self._pack.seek(position)
+        data = self._pack.read(pack_size - position)
+
+        cursor = 0
+        recovered = []
+        while cursor + RECORD_HEADER.size <= len(data):
+            key_length, payload_length = RECORD_HEADER.unpack_from(data, cursor)
+            payload_offset = cursor + RECORD_HEADER.size + key_length
+            if payload_offset + payload_length > len(data):
+                break
+            key = data[cursor + RECORD_HEADER.size:payload_offset].decode()
+            recovered.append((key, position + payload_offset, payload_length))
+            cursor = payload_offset + payload_length
+
+        if position + cursor < pack_size:
+            self._pack.truncate(position + cursor)
+
+        self._index.seek(0, os.SEEK_END)
+        for key, offset, length in recovered:
+            self._write_index_entry(key, offset, length)
+        self._index.flush()
+
+    def _write_index_entry(self, key: str, offset: int, length: int) -> None:
+        """
+        Records the position of a record in memory and in the index file.
+        """
+        self.offsets[key] = (offset, length)
+        self._index.write(f"{key}\t{offset}\t{length}\n")
+
+    def append(self, key: str, payload: bytes) -> None:
+        """
+        Compresses a payload and appends it to the pack under the given key.
+        A key written again is shadowed by its newest record.
+        """
+        encoded_key = key.encode()
+        compressed = zlib.compress(payload)
+
+        self._pack.seek(0, os.SEEK_END)
+        record_offset = self._pack.tell()
+        self._pack.write(RECORD_HEADER.pack(len(encoded_key), len(compressed)))
+        self._pack.write(encoded_key)
+        self._pack.write(compressed)
+        self._pack.flush()
+
+        self._write_index_entry(key, record_offset + RECORD_HEADER.size + len(encoded_key), len(compressed))
+        self._index.flush()
+
+    def delete(self, key: str) -> None:
+        """
+        Removes a key from the index. Its record stays in the pack until the pack is rewritten.
+        """
+        if self.offsets.pop(key, None) is not None:
+            self._index.write(f"{key}\t-1\t0\n")
+            self._index.flush()
+
+    def read(self, key: str) -> bytes:
+        """
+        Reads and decompresses the payload of a record through the memory map.
+        """
+        offset, length = self.offsets[key]
+        if self._map is None or offset + length > len(self._map):
+            self._remap()
+        return zlib.decompress(self._map[offset:offset + length])
+
+    def _remap(self) -> None:
+        """
+        Maps the current extent of the pack, after records were appended beyond the old map.
+        """
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._pack.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_record_size(self, key: str) -> int:
+        """
+        Returns the number of bytes the newest record of a key takes in the pack.
+        """
+        _, length = self.offsets[key]
+        return RECORD_HEADER.size + len(key.encode()) + length
+
+    def compact(self) -> int:
+        """
+        Rewrites the pack with only the newest record of every key, dropping deleted and shadowed records,
+        and returns the number of bytes freed. Compressed payloads are copied without being decompressed.
+        The old index is removed before the new files replace the old ones, so a crash in between
+        leaves a pack that is recovered by scanning it.
+        """
+        size_before = self.get_size()
+        if self.offsets and (self._map is None or size_before > len(self._map)):
+            self._remap()
+
+        compact_path = self.path + ".compact"
+        offsets = {}
+        with open(compact_path, "wb") as pack, open(compact_path + ".idx", "w") as index:
+            for key, (offset, length) in self.offsets.items():
+                encoded_key = key.encode()
+                pack.write(RECORD_HEADER.pack(len(encoded_key), length))
+                pack.write(encoded_key)
+                offsets[key] = (pack.tell(), length)
+                pack.write(self._map[offset:offset + length])
+                index.write(f"{key}\t{offsets[key][0]}\t{length}\n")
+
+        self.close()
+        os.remove(self.index_path)
+        os.replace(compact_path, self.path)
+        os.replace(compact_path + ".idx", self.index_path)
+
+        self.offsets = offsets
+        self._pack = open(self.path, "a+b")
+        self._index = open(self.index_path, "a+")
+        return size_before - self.get_size()
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterates over the keys in the order their records were first written.
+        """
+        return iter(self.offsets)
+
+    def get_size(self) -> int:
+        """
+        Returns the size of the pack in bytes.
+        """
+        self._pack.seek(0, os.SEEK_END)
+        return self._pack.tell()
+
+    def close(self) -> None:
+        """
+        Releases the memory map and the underlying files.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._pack.close()
+        self._index.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
@@ -1,35 +1,247 @@
+import os
+from collections import OrderedDict
 from datetime import datetime
-from typing import Tuple, Optional, List, Dict
+from itertools import count
+from typing import Tuple, Optional, List, Dict, Iterator, Callable
 
+from enums import LockModeEnum
 from models.document import Document
 from models.user import User
+from .blob_store import BlobStore
+from .diff import compute_hunks, format_unified, invert_opcodes, opcodes_from_delta
+from .journal import Journal
+from .lock_manager import LockManager
+from .merge import merge_three_way
+from .models import Branch, DiffHunk, MergeConflict, Version
 
 
 class VersionControl:
     """
     Represents a version control system for documents.
+    With a storage path, content blobs are kept in a packfile and version metadata in a journal
+    under that directory, and reopening the directory restores the branches of every document.
+    Authors are stored by id and restored through resolve_user; without it they come back as None.
     """
 
-    def __init__(self):
-        self.documents = {}  # example: {document_id: {branch_name: [versions]}}
+    def __init__(
+            self,
+            keyframe_interval: int = 16,
+            storage_path: Optional[str] = None,
+            resolve_user: Optional[Callable[[int], Optional[User]]] = None,
+            lock_ttl: float = 300.0,
+            diff_cache_size: int = 128,
+    ):
+        self.documents = {}  # example: {document_id: {branch_name: Branch}}
         self.active_branches = {}  # example: {document_id: active_branch_name}
-        self.locks = {}  # example: {document_id: user_id} - for document locking
+        self.lock_manager = LockManager(default_ttl=lock_ttl)  # document locks, held by user id
+        self.pending_merges = {}  # example: {document_id: merge awaiting conflict resolution}
+        self._version_sequence = count(1)
+        self.resolve_user = resolve_user
+        # Recently computed diffs, least recently used first
+        self.diff_cache = OrderedDict()  # {(from_digest, to_digest, context): (DiffHunk,)}
+        self.diff_cache_size = diff_cache_size
+        self.journal = None
+
+        if storage_path is None:
+            # Versions reference their content by digest; identical content is stored once
+            self.blob_store = BlobStore(keyframe_interval=keyframe_interval)
+        else:
+            os.makedirs(storage_path, exist_ok=True)
+            self.blob_store = BlobStore(
+                keyframe_interval=keyframe_interval,
+                storage_path=os.path.join(storage_path, "blobs.pack"),
+            )
+            self.journal = Journal(os.path.join(storage_path, "versions.journal"))
+            self._load_journal()
+
+    def _append_version(self, document_id: int, branch: Branch, content_digest: str, **metadata) -> Version:
+        """
+        Appends a version referencing stored content to a branch.
+        """
+        version = Version(
+            number=branch.head_number + 1,
+            content_digest=content_digest,
+            sequence=next(self._version_sequence),
+            **metadata,
+        )
+        branch.append_version(version)
+        self.blob_store.add_reference(content_digest)
+        self._journal_version(document_id, branch, version)
+        return version
+
+    def _journal_version(self, document_id: int, branch: Branch, version: Version) -> None:
+        """
+        Appends the metadata of a new version to the journal, when the versions are persisted.
+        """
+        if self.journal is None:
+            return
+
+        self.journal.append({
+            "type": "version",
+            "document_id": document_id,
+            "branch": branch.name,
+            "number": version.number,
+            "content_digest": version.content_digest,
+            "sequence": version.sequence,
+            "date": version.date.isoformat(),
+            "author_id": getattr(version.author, "id", None),
+            "description": version.description,
+            "parent_branch": version.parent_branch,
+            "parent_version": version.parent_version,
+            "merged_from": version.merged_from,
+            "merged_version": version.merged_version,
+            "conflict_resolution": version.conflict_resolution,
+        })
+
+    def _journal_active_branch(self, document_id: int) -> None:
+        """
+        Records the active branch of a document in the journal, when the versions are persisted.
+        """
+        if self.journal is not None:
+            self.journal.append(
+                {"type": "active", "document_id": document_id, "branch": self.active_branches[document_id]})
+
+    def _journal_pending_merge(self, document_id: int) -> None:
+        """
+        Records the merge awaiting resolution for a document, or that there is none anymore,
+        when the versions are persisted.
+        """
+        if self.journal is None:
+            return
+
+        pending_merge = self.pending_merges.get(document_id)
+        if pending_merge is not None:
+            pending_merge = dict(
+                pending_merge, conflicts=[conflict.to_dict() for conflict in pending_merge["conflicts"]])
+        self.journal.append({"type": "merge", "document_id": document_id, "pending": pending_merge})
+
+    def _load_journal(self) -> None:
+        """
+        Rebuilds branches and versions by replaying the journal in the order its records were written.
+        Only version metadata is read, so restart time grows with the number of journaled changes;
+        content stays in the blob pack until a version is read.
+        """
+        last_sequence = 0
+        for record in self.journal:
+            if record["type"] == "active":
+                self.active_branches[record["document_id"]] = record["branch"]
+            elif record["type"] == "delete":
+                self._remove_branch(record["document_id"], record["branch"])
+            elif record["type"] == "prune":
+                branch = self.documents[record["document_id"]][record["branch"]]
+                self.blob_store.release_reference(branch.remove_version(record["number"]).content_digest)
+            elif record["type"] == "merge":
+                pending_merge = record["pending"]
+                if pending_merge is None:
+                    self.pending_merges.pop(record["document_id"], None)
+                else:
+                    pending_merge["conflicts"] = [
+                        MergeConflict.from_dict(conflict) for conflict in pending_merge["conflicts"]]
+                    self.pending_merges[record["document_id"]] = pending_merge
+            else:
+                last_sequence = max(last_sequence, record["sequence"])
+                self._replay_version(record)
+
+        self._version_sequence = count(last_sequence + 1)
+
+    def _replay_version(self, record: Dict) -> None:
+        """
+        Restores a journaled version, creating its branch when the version is the first one.
+        """
+        branches = self.documents.setdefault(record["document_id"], {})
+        self.active_branches.setdefault(record["document_id"], "main")
+
+        branch = branches.get(record["branch"])
+        if branch is None:
+            ancestors = {}
+            parent_branch = branches.get(record["parent_branch"])
+            if parent_branch is not None:
+                ancestors = dict(parent_branch.ancestors)
+                ancestors[parent_branch.name] = record["parent_version"]
+            branch = Branch(
+                record["branch"],
+                parent_branch_name=record["parent_branch"],
+                parent_version=record["parent_version"],
+                ancestors=ancestors,
+            )
+            branches[branch.name] = branch
+
+        if record["merged_from"] in branches:
+            self._record_merge(branches[record["merged_from"]], branch, record["merged_version"])
+
+        author_id = record["author_id"]
+        branch.append_version(Version(
+            number=record["number"],
+            content_digest=record["content_digest"],
+            sequence=record["sequence"],
+            date=datetime.fromisoformat(record["date"]),
+            author=self.resolve_user(author_id) if self.resolve_user and author_id is not None else None,
+            description=record["description"],
+            parent_branch=record["parent_branch"],
+            parent_version=record["parent_version"],
+            merged_from=record["merged_from"],
+            merged_version=record["merged_version"],
+            conflict_resolution=record["conflict_resolution"],
+        ))
+        self.blob_store.add_reference(record["content_digest"])
+
+    def get_last_document_id(self) -> int:
+        """
+        Returns the highest id of a document with version history, or 0 if there is none.
+        New documents must get higher ids, or they would take over a persisted history.
+        """
+        return max(self.documents, default=0)
+
+    def close(self) -> None:
+        """
+        Closes the files holding persisted versions.
+        """
+        self.blob_store.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    def _store_content(self, branch: Branch, content: str, digest: Optional[str] = None) -> str:
+        """
+        Stores a content in the blob store, delta-encoded against the head of the branch.
+        """
+        base_digest = branch.head.content_digest if branch.head else None
+        return self.blob_store.put(content, base_digest=base_digest, digest=digest)
+
+    def _get_branch(self, document: Document, branch_name: Optional[str] = None) -> Optional[Branch]:
+        """
+        Returns a branch of the document, defaulting to the active branch.
+        """
+        if document.id not in self.documents:
+            return None
+
+        if branch_name is None:
+            branch_name = self.active_branches[document.id]
+
+        return self.documents[document.id].get(branch_name)
+
+    def _materialize(self, version: Version, include_content: bool = True) -> Dict:
+        """
+        Returns a version as a history entry, reconstructing its content only when requested.
+        """
+        entry = version.to_dict()
+        if include_content:
+            entry["content"] = self.blob_store.get(version.content_digest)
+        return entry
 
     def initialize_version_control(self, document: Document) -> None:
         """
         Initializes version control for a new document.
         """
         if document.id not in self.documents:
-            self.documents[document.id] = {
-                "main": [
-                    {
-                        "version": 1,
-                        "content": document.content,
-                        "date": document.created_date,
-                        "author": document.author
-                    }
-                ]
-            }
+            main_branch = Branch("main")
+            self.documents[document.id] = {"main": main_branch}
+            self._append_version(
+                document.id,
+                main_branch,
+                self._store_content(main_branch, document.content, digest=document.content_digest),
+                date=document.created_date,
+                author=document.author,
+            )
             self.active_branches[document.id] = "main"
             document.add_history_entry("Version control system initialized")
 
@@ -44,18 +256,26 @@ class VersionControl:
         if branch_name in self.documents[document.id]:
             return False
 
-        active_branch = self.active_branches[document.id]
-        latest_version = self.documents[document.id][active_branch][-1]
-        self.documents[document.id][branch_name] = [
-            {
-                "version": 1,
-                "content": latest_version["content"],
-                "date": datetime.now(),
-                "author": user,
-                "parent_branch": active_branch,
-                "parent_version": len(self.documents[document.id][active_branch])
-            }
-        ]
+        active_branch = self._get_branch(document)
+        ancestors = dict(active_branch.ancestors)
+        ancestors[active_branch.name] = active_branch.head_number
+
+        new_branch = Branch(
+            branch_name,
+            parent_branch_name=active_branch.name,
+            parent_version=active_branch.head_number,
+            ancestors=ancestors,
+        )
+        self.documents[document.id][branch_name] = new_branch
+        self._append_version(
+            document.id,
+            new_branch,
+            active_branch.head.content_digest,
+            date=datetime.now(),
+            author=user,
+            parent_branch=active_branch.name,
+            parent_version=active_branch.head_number,
+        )
 
         document.add_history_entry(f"Branch '{branch_name}' created by {user.username}")
         return True
@@ -68,9 +288,10 @@ class VersionControl:
             return False
 
         self.active_branches[document.id] = branch_name
-        latest_version = self.documents[document.id][branch_name][-1]
-        document.content = latest_version["content"]
-        document.version = len(self.documents[document.id][branch_name])
+        self._journal_active_branch(document.id)
+        branch = self.documents[document.id][branch_name]
+        document.content = self.blob_store.get(branch.head.content_digest)
+        document.version = branch.head_number
         document.add_history_entry(f"Switched to branch '{branch_name}' by {user.username}")
         return True
 
@@ -81,25 +302,25 @@ class VersionControl:
         if document.id not in self.documents:
             self.initialize_version_control(document)
 
-        active_branch = self.active_branches[document.id]
+        active_branch = self._get_branch(document)
 
-        latest_version = self.documents[document.id][active_branch][-1]
-        if latest_version["content"] == document.content:
+        # The document caches the digest of its content, so unchanged content is not hashed again
+        content_digest = document.content_digest
+        if active_branch.head.content_digest == content_digest:
             return False
 
-        next_version_number = len(self.documents[document.id][active_branch]) + 1
-        self.documents[document.id][active_branch].append(
-            {
-                "version": next_version_number,
-                "content": document.content,
-                "date": datetime.now(),
-                "author": user,
-                "description": description
-            }
+        new_version = self._append_version(
+            document.id,
+            active_branch,
+            self._store_content(active_branch, document.content, digest=content_digest),
+            date=datetime.now(),
+            author=user,
+            description=description,
         )
+        next_version_number = new_version.number
         document.version = next_version_number
         document.add_history_entry(
-            f"Version {next_version_number} saved in branch '{active_branch}' by {user.username}: {description}")
+            f"Version {next_version_number} saved in branch '{active_branch.name}' by {user.username}: {description}")
         return True
 
     def merge_branches(
@@ -118,114 +339,404 @@ class VersionControl:
         if source_branch not in self.documents[document.id] or target_branch not in self.documents[document.id]:
             return False, "Specified branch does not exist"
 
-        source_content = self.documents[document.id][source_branch][-1]["content"]
-        target_content = self.documents[document.id][target_branch][-1]["content"]
+        source = self.documents[document.id][source_branch]
+        target = self.documents[document.id][target_branch]
+        source_digest = source.head.content_digest
+        target_digest = target.head.content_digest
 
-        if source_content == target_content:
+        if source_digest == target_digest:
             return True, "Branches are identical, no merge needed"
 
-        next_version_number = len(self.documents[document.id][target_branch]) + 1
-        self.documents[document.id][target_branch].append(
-            {
-                "version": next_version_number,
-                "content": source_content,
-                "date": datetime.now(),
-                "author": user,
-                "description": f"Merged from branch '{source_branch}'",
-                "merged_from": source_branch,
-                "merged_version": len(self.documents[document.id][source_branch])
-            }
+        base_digest = self._find_merge_base(document.id, source, target)
+
+        if base_digest == source_digest:
+            return True, "Target branch already contains the source changes"
+
+        if base_digest == target_digest:
+            merged_digest = source_digest
+        else:
+            merged_content, conflicts = merge_three_way(
+                self.blob_store.get(base_digest) if base_digest else "",
+                self.blob_store.get(source_digest),
+                self.blob_store.get(target_digest),
+                source_label=source_branch,
+                target_label=target_branch,
+            )
+            if conflicts:
+                self.pending_merges[document.id] = {
+                    "source_branch": source_branch,
+                    "target_branch": target_branch,
+                    "source_version": source.head_number,
+                    "target_version": target.head_number,
+                    "content": merged_content,
+                    "conflicts": conflicts,
+                }
+                self._journal_pending_merge(document.id)
+                document.add_history_entry(
+                    f"Merge of '{source_branch}' into '{target_branch}' by {user.username} "
+                    f"stopped with {len(conflicts)} conflict(s)")
+                return False, f"Merge conflicts detected in {len(conflicts)} region(s)"
+
+            merged_digest = self._store_content(target, merged_content)
+
+        self._append_version(
+            document.id,
+            target,
+            merged_digest,
+            date=datetime.now(),
+            author=user,
+            description=f"Merged from branch '{source_branch}'",
+            merged_from=source_branch,
+            merged_version=source.head_number,
         )
+        self._record_merge(source, target, source.head_number)
 
         document.add_history_entry(f"Merged branch '{source_branch}' into '{target_branch}' by {user.username}")
         return True, "Merge completed successfully"
 
+    def _find_merge_base(self, document_id: int, source: Branch, target: Branch) -> Optional[str]:
+        """
+        Finds the content digest of the latest common ancestor of two branch heads.
+        Each branch records the newest version of every other branch it contains, so the common
+        ancestors are read from those records instead of walking the histories.
+        """
+        branches = self.documents[document_id]
+
+        source_known = dict(source.ancestors)
+        source_known[source.name] = source.head_number
+        target_known = dict(target.ancestors)
+        target_known[target.name] = target.head_number
+
+        best_version = None
+        for branch_name in source_known.keys() & target_known.keys():
+            version_number = min(source_known[branch_name], target_known[branch_name])
+            branch = branches.get(branch_name)
+            version = branch.get_version(version_number) if branch else None
+            if version is not None and (best_version is None or version.sequence > best_version.sequence):
+                best_version = version
+
+        return best_version.content_digest if best_version else None
+
+    @staticmethod
+    def _record_merge(source: Branch, target: Branch, source_version: int) -> None:
+        """
+        Marks the merged source versions, and everything they contain, as ancestors of the target.
+        """
+        for branch_name, version_number in source.ancestors.items():
+            if branch_name != target.name:
+                target.ancestors[branch_name] = max(target.ancestors.get(branch_name, 0), version_number)
+        target.ancestors[source.name] = max(target.ancestors.get(source.name, 0), source_version)
+
+    def delete_branch(self, document_id: int, branch_name: str) -> bool:
+        """
+        Deletes a branch of a document, releasing the content of its versions.
+        The main branch, the active branch and a branch taking part in a pending merge cannot be deleted.
+        """
+        branches = self.documents.get(document_id, {})
+        pending_merge = self.pending_merges.get(document_id)
+        if (branch_name == "main" or branch_name not in branches
+                or self.active_branches.get(document_id) == branch_name
+                or (pending_merge and branch_name in (pending_merge["source_branch"], pending_merge["target_branch"]))):
+            return False
+
+        if self.journal is not None:
+            self.journal.append({"type": "delete", "document_id": document_id, "branch": branch_name})
+        self._remove_branch(document_id, branch_name)
+        return True
+
+    def _remove_branch(self, document_id: int, branch_name: str) -> None:
+        """
+        Removes a branch and the references other branches hold to its versions.
+        """
+        branch = self.documents[document_id].pop(branch_name)
+        for version in branch.versions:
+            self.blob_store.release_reference(version.content_digest)
+        for other_branch in self.documents[document_id].values():
+            other_branch.ancestors.pop(branch_name, None)
+
+    def prune_version(self, document_id: int, branch_name: str, version_number: int) -> bool:
+        """
+        Removes a version from the history of a branch, releasing its content.
+        The head cannot be pruned; the numbers of the remaining versions do not change.
+        """
+        branch = self.documents.get(document_id, {}).get(branch_name)
+        version = branch.remove_version(version_number) if branch else None
+        if version is None:
+            return False
+
+        self.blob_store.release_reference(version.content_digest)
+        if self.journal is not None:
+            self.journal.append(
+                {"type": "prune", "document_id": document_id, "branch": branch_name, "number": version_number})
+        return True
+
+    def get_merge_conflicts(self, document: Document) -> List[MergeConflict]:
+        """
+        Returns the conflicts of the merge awaiting resolution for the document.
+        """
+        pending_merge = self.pending_merges.get(document.id)
+        return pending_merge["conflicts"] if pending_merge else []
+
     def resolve_conflict(self, document: Document, content: str, user: User, description: str) -> bool:
         """
         Resolves a merge conflict by creating a new version. Need user instance for conflict resolution.
+        When a merge is awaiting resolution, the version completes that merge in its target branch.
+        If the target branch has new versions since the conflict, the resolution would overwrite them,
+        so it is rejected and the merge has to be run again.
         """
         if document.id not in self.documents:
             return False
 
+        pending_merge = self.pending_merges.pop(document.id, None)
+        if pending_merge:
+            self._journal_pending_merge(document.id)
+            target = self.documents[document.id][pending_merge["target_branch"]]
+            if target.head_number != pending_merge["target_version"]:
+                document.add_history_entry(
+                    f"Resolution of the merge of '{pending_merge['source_branch']}' into "
+                    f"'{pending_merge['target_branch']}' by {user.username} rejected: the target branch has changed")
+                return False
+
         active_branch = self.active_branches[document.id]
-        next_version_number = len(self.documents[document.id][active_branch]) + 1
-
-        self.documents[document.id][active_branch].append(
-            {
-                "version": next_version_number,
-                "content": content,
-                "date": datetime.now(),
-                "author": user,
-                "description": f"Conflict resolution: {description}",
-                "conflict_resolution": True
-            }
+        branch_name = pending_merge["target_branch"] if pending_merge else active_branch
+        branch = self.documents[document.id][branch_name]
+
+        metadata = {}
+        if pending_merge:
+            metadata = {"merged_from": pending_merge["source_branch"], "merged_version": pending_merge["source_version"]}
+
+        new_version = self._append_version(
+            document.id,
+            branch,
+            self._store_content(branch, content),
+            date=datetime.now(),
+            author=user,
+            description=f"Conflict resolution: {description}",
+            conflict_resolution=True,
+            **metadata,
         )
+        if pending_merge:
+            source = self.documents[document.id][pending_merge["source_branch"]]
+            self._record_merge(source, branch, pending_merge["source_version"])
 
-        document.content = content
-        document.version = next_version_number
+        if branch_name == active_branch:
+            document.content = content
+            document.version = new_version.number
         document.add_history_entry(f"Conflict resolved by {user.username}: {description}")
         return True
 
-    def get_version_history(self, document: Document, branch_name: Optional[str] = None) -> List[Dict]:
+    def iter_version_history(
+            self,
+            document: Document,
+            branch_name: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            newest_first: bool = False,
+            include_content: bool = True,
+    ) -> Iterator[Dict]:
         """
-        Gets the version history of the document for a specific branch.
+        Lazily yields history entries of a branch, one version at a time.
+        The offset and limit select a page in the requested order, and only the versions on that page
+        are turned into entries, so content outside the page is never reconstructed.
         """
-        if document.id not in self.documents:
-            return []
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("Offset and limit must not be negative.")
 
-        if branch_name is None:
-            branch_name = self.active_branches[document.id]
+        branch = self._get_branch(document, branch_name)
+        if branch is None:
+            return
 
-        if branch_name not in self.documents[document.id]:
-            return []
+        version_count = branch.version_count
+        stop = version_count if limit is None else min(version_count, offset + limit)
+        for position in range(offset, stop):
+            index = version_count - 1 - position if newest_first else position
+            yield self._materialize(branch.versions[index], include_content)
 
-        return self.documents[document.id][branch_name]
+    def get_version_history(
+            self,
+            document: Document,
+            branch_name: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            newest_first: bool = False,
+            include_content: bool = True,
+    ) -> List[Dict]:
+        """
+        Gets a page of the version history of the document for a specific branch.
+        """
+        return list(self.iter_version_history(
+            document, branch_name, offset=offset, limit=limit, newest_first=newest_first,
+            include_content=include_content,
+        ))
 
-    def checkout_version(self, document: Document, version_number: int, user: User) -> bool:
+    def get_version_content(self, document: Document, version_number: int, branch_name: Optional[str] = None
+                            ) -> Optional[str]:
         """
-        Returns the document to a specific version
+        Gets the content of a specific version, reconstructing it from the stored deltas.
         """
-        if document.id not in self.documents:
-            return False
+        branch = self._get_branch(document, branch_name)
+        version = branch.get_version(version_number) if branch else None
+        if version is None:
+            return None
 
-        active_branch = self.active_branches[document.id]
+        return self.blob_store.get(version.content_digest)
+
+    def get_version_count(self, document: Document, branch_name: Optional[str] = None) -> int:
+        """
+        Gets the number of versions in a branch of the document.
+        """
+        branch = self._get_branch(document, branch_name)
+        return branch.version_count if branch else 0
 
-        if version_number <= 0 or version_number > len(self.documents[document.id][active_branch]):
+    def checkout_version(self, document: Document, version_number: int, user: User) -> bool:
+        """
+        Returns the document to a specific version
+        """
+        branch = self._get_branch(document)
+        version = branch.get_version(version_number) if branch else None
+        if version is None:
             return False
 
-        target_version = self.documents[document.id][active_branch][version_number - 1]
-        document.content = target_version["content"]
+        document.content = self.blob_store.get(version.content_digest)
 
         document.add_history_entry(f"Reverted to version {version_number} by {user.username}")
         return True
 
-    def lock_document(self, document: Document, user: User) -> bool:
+    def diff_versions(
+            self,
+            document: Document,
+            from_version: int,
+            to_version: int,
+            from_branch: Optional[str] = None,
+            to_branch: Optional[str] = None,
+            context: int = 3,
+    ) -> Optional[List[DiffHunk]]:
         """
-        Locks the document for editing
+        Computes the line-level hunks between two versions, which may be on different branches.
+        Returns None if either version does not exist.
         """
-        if document.id in self.locks:
-            return False  # Document is already locked
+        versions = self._get_diff_versions(document, from_version, to_version, from_branch, to_branch)
+        if versions is None:
+            return None
 
-        self.locks[document.id] = user.id
-        document.add_history_entry(f"Document locked for editing by {user.username}")
+        return list(self._diff_digests(versions[0].content_digest, versions[1].content_digest, context))
+
+    def get_unified_diff(
+            self,
+            document: Document,
+            from_version: int,
+            to_version: int,
+            from_branch: Optional[str] = None,
+            to_branch: Optional[str] = None,
+            context: int = 3,
+    ) -> Optional[str]:
+        """
+        Renders the diff between two versions in the unified format.
+        """
+        versions = self._get_diff_versions(document, from_version, to_version, from_branch, to_branch)
+        if versions is None:
+            return None
+
+        from_branch_name = from_branch or self.active_branches[document.id]
+        to_branch_name = to_branch or self.active_branches[document.id]
+        return format_unified(
+            self._diff_digests(versions[0].content_digest, versions[1].content_digest, context),
+            f"{from_branch_name}@{from_version}",
+            f"{to_branch_name}@{to_version}",
+        )
+
+    def _get_diff_versions(
+            self,
+            document: Document,
+            from_version: int,
+            to_version: int,
+            from_branch: Optional[str],
+            to_branch: Optional[str],
+    ) -> Optional[Tuple[Version, Version]]:
+        """
+        Looks up the two versions of a diff.
+        """
+        old_branch = self._get_branch(document, from_branch)
+        new_branch = self._get_branch(document, to_branch)
+        old_version = old_branch.get_version(from_version) if old_branch else None
+        new_version = new_branch.get_version(to_version) if new_branch else None
+        if old_version is None or new_version is None:
+            return None
+
+        return old_version, new_version
+
+    def _diff_digests(self, from_digest: str, to_digest: str, context: int) -> Tuple[DiffHunk, ...]:
+        """
+        Computes the hunks between two stored contents, reusing recently computed diffs.
+        When one content is stored as a delta of the other, the delta provides the diff directly.
+        """
+        cache_key = (from_digest, to_digest, context)
+        if cache_key in self.diff_cache:
+            self.diff_cache.move_to_end(cache_key)
+            return self.diff_cache[cache_key]
+
+        if from_digest == to_digest:
+            hunks = ()
+        else:
+            old_content = self.blob_store.get(from_digest)
+            new_content = self.blob_store.get(to_digest)
+
+            opcodes = None
+            if self.blob_store.get_base(to_digest) == from_digest:
+                opcodes = opcodes_from_delta(
+                    len(old_content.splitlines()), self.blob_store.get_delta(to_digest))
+            elif self.blob_store.get_base(from_digest) == to_digest:
+                opcodes = opcodes_from_delta(
+                    len(new_content.splitlines()), self.blob_store.get_delta(from_digest))
+                opcodes = invert_opcodes(opcodes) if opcodes is not None else None
+
+            hunks = tuple(compute_hunks(old_content, new_content, context, opcodes))
+
+        self.diff_cache[cache_key] = hunks
+        if len(self.diff_cache) > self.diff_cache_size:
+            self.diff_cache.popitem(last=False)
+        return hunks
+
+    def lock_document(
+            self,
+            document: Document,
+            user: User,
+            mode: LockModeEnum = LockModeEnum.EXCLUSIVE,
+            ttl: Optional[float] = None,
+            timeout: Optional[float] = 0,
+    ) -> bool:
+        """
+        Locks the document, exclusively for editing or shared for reading, with a lease that expires after ttl
+        seconds unless renewed. Waits up to timeout seconds for conflicting locks to be released or expire.
+        """
+        if self.lock_manager.acquire(document.id, user.id, mode=mode, ttl=ttl, timeout=timeout) is None:
+            return False  # Document is locked by another user
+
+        purpose = "editing" if mode == LockModeEnum.EXCLUSIVE else "reading"
+        document.add_history_entry(f"Document locked for {purpose} by {user.username}")
         return True
 
+    def renew_document_lock(self, document: Document, user: User, ttl: Optional[float] = None) -> bool:
+        """
+        Extends the lease of a lock the user holds on the document.
+        """
+        return self.lock_manager.renew(document.id, user.id, ttl=ttl)
+
     def unlock_document(self, document: Document, user: User) -> bool:
         """
         Unlocks the document for editing.
         """
-        if document.id not in self.locks or self.locks[document.id] != user.id:
+        if not self.lock_manager.release(document.id, user.id):
             return False
 
-        del self.locks[document.id]
         document.add_history_entry(f"Document unlocked by {user.username}")
         return True
 
-    def is_document_locked(self, document: Document) -> bool:
+    def is_document_locked(self, document: Document, mode: Optional[LockModeEnum] = None) -> bool:
         """
-        Checks if the document is locked for editing.
+        Checks if the document is locked, optionally in a specific mode.
         """
-        return document.id in self.locks
+        return self.lock_manager.is_locked(document.id, mode)
 
     def get_document_branches(self, document: Document) -> List[str]:
         """
@@ -0,0 +1,26 @@
+import random
+
+from services.aho_corasick import AhoCorasickAutomaton
+
+
+class TestAhoCorasickAutomaton:
+    def test_find_patterns(self):
+        automaton = AhoCorasickAutomaton(["he", "she", "his", "hers"])
+
+        assert automaton.find_patterns("ushers") == {"he", "she", "hers"}
+        assert automaton.find_patterns("this") == {"his"}
+        assert automaton.find_patterns("xyz") == set()
+
+    def test_overlapping_and_nested_patterns(self):
+        automaton = AhoCorasickAutomaton(["market", "marketing", "ark", "keting"])
+
+        assert automaton.find_patterns("supermarketing") == {"market", "marketing", "ark", "keting"}
+
+    def test_matches_naive_substring_search(self):
+        generator = random.Random(7)
+        patterns = ["".join(generator.choice("abc") for _ in range(generator.randint(1, 4))) for _ in range(20)]
+        automaton = AhoCorasickAutomaton(patterns)
+
+        for _ in range(200):
+            text = "".join(generator.choice("abcd") for _ in range(generator.randint(0, 12)))
+            assert automaton.find_patterns(text) == {pattern for pattern in patterns if pattern in text}
@@ -0,0 +1,47 @@
+from services.version_control.blob_store import BlobStore
+
+
+class TestBlobStore:
+    def test_put_and_get(self):
+        blob_store = BlobStore()
+
+        digest = blob_store.put("Contract text")
+
+        assert digest == BlobStore.compute_digest("Contract text")
+        assert digest in blob_store
+        assert blob_store.get(digest) == "Contract text"
+
+    def test_identical_content_is_stored_once(self):
+        blob_store = BlobStore()
+
+        first_digest = blob_store.put("Same text")
+        second_digest = blob_store.put("Same text", base_digest=first_digest)
+
+        assert first_digest == second_digest
+        assert len(blob_store) == 1
+
+    def test_delta_chain_is_capped_by_keyframes(self):
+        blob_store = BlobStore(keyframe_interval=3)
+        digest = None
+        contents = []
+        for index in range(7):
+            contents.append("\n".join(f"clause {number}" for number in range(index + 1)))
+            digest = blob_store.put(contents[-1], base_digest=digest)
+            assert blob_store.get(digest) == contents[-1]
+
+        depths = [blob_store.get_depth(BlobStore.compute_digest(content)) for content in contents]
+        assert depths == [0, 1, 2, 0, 1, 2, 0]
+
+    def test_blobs_persist_in_packfile(self, tmp_path):
+        path = str(tmp_path / "blobs.pack")
+        blob_store = BlobStore(keyframe_interval=3, storage_path=path)
+        first_digest = blob_store.put("clause 1\n")
+        second_digest = blob_store.put("clause 1\nclause 2\n", base_digest=first_digest)
+        blob_store.close()
+
+        reopened = BlobStore(keyframe_interval=3, storage_path=path)
+
+        assert len(reopened) == 2
+        assert reopened.get_depth(second_digest) == 1
+        assert reopened.get(second_digest) == "clause 1\nclause 2\n"
+        reopened.close()
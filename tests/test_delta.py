@@ -0,0 +1,23 @@
+from services.version_control.delta import COPY, INSERT, apply_delta, compute_delta
+
+
+class TestDelta:
+    def test_round_trip(self):
+        base = "line one\nline two\nline three\n"
+        target = "line one\nline 2\nline three\nline four"
+
+        delta = compute_delta(base, target)
+
+        assert apply_delta(base, delta) == target
+
+    def test_unchanged_lines_are_references(self):
+        base = "".join(f"clause {index}\n" for index in range(100))
+        target = base.replace("clause 50\n", "clause fifty\n")
+
+        delta = compute_delta(base, target)
+
+        assert delta == ((COPY, 0, 50), (INSERT, "clause fifty\n"), (COPY, 51, 100))
+
+    def test_empty_contents(self):
+        assert apply_delta("", compute_delta("", "new text")) == "new text"
+        assert apply_delta("old text", compute_delta("old text", "")) == ""
@@ -57,7 +57,7 @@ class TestDepartment:
             author=user,
             document_type=DocumentTypeEnum.CONTRACT
         )
-        user.documents.append(document)
+        user.add_document(document)
 
         documents = department.get_all_members_documents()
 
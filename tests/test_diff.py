@@ -0,0 +1,43 @@
+from services.version_control.delta import compute_delta
+from services.version_control.diff import compute_hunks, format_unified, invert_opcodes, opcodes_from_delta
+
+
+def _sides(hunks):
+    old = [line for hunk in hunks for marker, line in hunk.lines if marker != "+"]
+    new = [line for hunk in hunks for marker, line in hunk.lines if marker != "-"]
+    return "".join(old), "".join(new)
+
+
+class TestDiff:
+    def test_compute_hunks(self):
+        old = "".join(f"line {number}\n" for number in range(1, 21))
+        new = old.replace("line 2\n", "line two\n").replace("line 18\n", "")
+
+        hunks = compute_hunks(old, new, context=2)
+
+        assert [hunk.header for hunk in hunks] == ["@@ -1,4 +1,4 @@", "@@ -16,5 +16,4 @@"]
+        assert hunks[0].lines[1:3] == (("-", "line 2\n"), ("+", "line two\n"))
+
+    def test_identical_contents_have_no_hunks(self):
+        assert compute_hunks("same\n", "same\n") == []
+
+    def test_opcodes_from_delta_match_contents(self):
+        old = "".join(f"clause {number}\n" for number in range(1, 30))
+        new = old.replace("clause 3\n", "").replace("clause 10\n", "clause ten\nclause ten b\n") + "clause 30\n"
+
+        opcodes = opcodes_from_delta(len(old.splitlines()), compute_delta(old, new))
+        hunks = compute_hunks(old, new, context=100, opcodes=opcodes)
+        inverted = compute_hunks(new, old, context=100, opcodes=invert_opcodes(opcodes))
+
+        assert _sides(hunks) == (old, new)
+        assert _sides(inverted) == (new, old)
+        assert [hunk.header for hunk in compute_hunks(old, new, opcodes=opcodes)] == [
+            hunk.header for hunk in compute_hunks(old, new)
+        ]
+
+    def test_format_unified(self):
+        hunks = compute_hunks("a\nb\nc\n", "a\nB\nc")
+
+        assert format_unified(hunks, "main@1", "main@2") == (
+            "--- main@1\n+++ main@2\n@@ -1,3 +1,3 @@\n a\n-b\n-c\n+B\n+c\n\\ No newline at end of file\n"
+        )
@@ -71,3 +71,24 @@ class TestDocument:
 
         assert len(document.history) == 2
         assert document.history[-1]["entry_message"] == entry_message
+
+    def test_content_digest_is_cached_until_content_changes(self, document_payload, user, monkeypatch):
+        document = Document(
+            title=document_payload["title"],
+            content=document_payload["content"],
+            author=document_payload["author"],
+            document_type=document_payload["document_type"]
+        )
+        hashed = []
+        hash_content = Document.hash_content
+        monkeypatch.setattr(
+            Document, "hash_content", staticmethod(lambda content: hashed.append(content) or hash_content(content)))
+
+        first_digest = document.content_digest
+        assert document.content_digest == first_digest
+        assert hashed == [document_payload["content"]]
+
+        document.update_content(new_content="This is the updated content.", editor=user)
+
+        assert document.content_digest == hash_content("This is the updated content.")
+        assert len(hashed) == 2
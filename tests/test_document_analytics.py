@@ -1,8 +1,10 @@
+import io
+
 import pytest
 from models.document import Document
 from models.user import User
 from enums import DocumentTypeEnum, PositionEnum, AccessLevelEnum
-from services.document_analytics import DocumentAnalytics
+from services.document_analytics import DocumentAnalytics, iter_words
 
 
 class TestDocumentAnalytics:
@@ -97,3 +99,258 @@ class TestDocumentAnalytics:
 
         assert isinstance(related, list)
         assert related_doc.id in related
+
+    def test_find_duplicates_ignores_dissimilar_documents(self, document_analytics, document, user):
+        other_doc = Document(
+            title="HR Policy",
+            content="This HR policy document describes employee benefits and vacation policies.",
+            author=user,
+            document_type=DocumentTypeEnum.POLICY
+        )
+        document_analytics.analyze_document(document)
+        document_analytics.analyze_document(other_doc)
+
+        assert document_analytics.find_duplicates(document) == []
+
+    def test_lsh_buckets_follow_reanalysis(self, document_analytics, document, user):
+        similar_doc = Document(
+            title="Similar Financial Report",
+            content=document.content,
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        document_analytics.analyze_document(document)
+        document_analytics.analyze_document(similar_doc)
+
+        similar_doc.content = "Completely different text about server network equipment maintenance."
+        document_analytics.analyze_document(similar_doc)
+
+        assert document_analytics.find_duplicates(document) == []
+        assert all(
+            similar_doc.id not in bucket
+            for buckets in document_analytics.lsh_buckets
+            for band_key, bucket in buckets.items()
+            if band_key in document_analytics._band_keys(document_analytics.document_signatures[document.id])
+        )
+
+    def test_configure_lsh_rebuilds_signatures(self, document_analytics, document, user):
+        similar_doc = Document(
+            title="Similar Financial Report",
+            content=document.content,
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        document_analytics.analyze_document(document)
+        document_analytics.analyze_document(similar_doc)
+
+        document_analytics.configure_lsh(bands=8, rows=2)
+
+        assert len(document_analytics.lsh_buckets) == 8
+        assert len(document_analytics.document_signatures[document.id]) == 16
+        assert document_analytics.find_duplicates(document) == [similar_doc.id]
+
+        with pytest.raises(ValueError):
+            document_analytics.configure_lsh(bands=0, rows=4)
+
+    def test_jaccard_scores(self, document_analytics, document, user):
+        related_doc = Document(
+            title="Budget Planning",
+            content="This document covers budget planning for the financial year.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        unrelated_doc = Document(
+            title="Network",
+            content="Server network equipment maintenance.",
+            author=user,
+            document_type=DocumentTypeEnum.POLICY
+        )
+        for doc in (document, related_doc, unrelated_doc):
+            document_analytics.analyze_document(doc)
+
+        scores = document_analytics.jaccard_scores(document)
+        expected_keywords = document_analytics.document_keywords
+        expected = len(expected_keywords[document.id] & expected_keywords[related_doc.id]) / len(
+            expected_keywords[document.id] | expected_keywords[related_doc.id])
+
+        assert scores == {related_doc.id: pytest.approx(expected)}
+
+        block_scores = document_analytics.batch_jaccard_scores([document, related_doc])
+        assert block_scores[document.id] == scores
+        assert block_scores[related_doc.id][document.id] == pytest.approx(expected)
+        assert unrelated_doc.id not in block_scores[document.id]
+
+    def test_find_duplicate_pairs(self, document_analytics, document, user):
+        copies = [
+            Document(
+                title=f"Copy {index}",
+                content=document.content,
+                author=user,
+                document_type=DocumentTypeEnum.CONTRACT
+            )
+            for index in range(2)
+        ]
+        other_doc = Document(
+            title="HR Policy",
+            content="This HR policy document describes employee benefits and vacation policies.",
+            author=user,
+            document_type=DocumentTypeEnum.POLICY
+        )
+        for doc in [document, other_doc] + copies:
+            document_analytics.analyze_document(doc)
+
+        pairs = document_analytics.find_duplicate_pairs()
+
+        assert sorted((first, second) for first, second, _ in pairs) == [
+            (document.id, copies[0].id),
+            (document.id, copies[1].id),
+            (copies[0].id, copies[1].id),
+        ]
+        assert all(similarity == 1.0 for _, _, similarity in pairs)
+
+    def test_find_top_related_documents(self, document_analytics, document, user):
+        close_doc = Document(
+            title="Budget Review",
+            content="Financial report on budget planning and expense review.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        distant_doc = Document(
+            title="Budget Planning",
+            content="This document covers budget for the year.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        unrelated_doc = Document(
+            title="Network",
+            content="Server network equipment maintenance.",
+            author=user,
+            document_type=DocumentTypeEnum.POLICY
+        )
+        for doc in (document, close_doc, distant_doc, unrelated_doc):
+            document_analytics.analyze_document(doc)
+
+        ranked = document_analytics.find_top_related_documents(document, top_k=5)
+
+        assert [doc_id for doc_id, _ in ranked] == [close_doc.id, distant_doc.id]
+        assert ranked[0][1] > ranked[1][1]
+        assert document_analytics.find_top_related_documents(document, top_k=1) == ranked[:1]
+
+    def test_find_top_related_documents_skips_frequent_keywords(self, document_analytics, user):
+        documents = [
+            Document(
+                title=f"Notice {index}",
+                content=f"Common notice text {'alpha' if index == 0 else 'beta'}{index}",
+                author=user,
+                document_type=DocumentTypeEnum.LETTER
+            )
+            for index in range(5)
+        ]
+        for doc in documents:
+            document_analytics.analyze_document(doc)
+
+        assert len(document_analytics.find_top_related_documents(documents[0], top_k=10)) == 4
+        assert document_analytics.find_top_related_documents(documents[0], min_skipped_postings=5) == []
+
+    def test_analyze_documents(self, document_analytics, document, user):
+        documents = [document] + [
+            Document(
+                title=f"Budget {index}",
+                content=f"Budget planning and expense analysis number{index}.",
+                author=user,
+                document_type=DocumentTypeEnum.CONTRACT
+            )
+            for index in range(3)
+        ]
+        document_analytics.parallel_batch_threshold = 2
+
+        results = document_analytics.analyze_documents(documents, max_workers=2)
+
+        assert set(results) == {doc.id for doc in documents}
+        for doc in documents:
+            assert results[doc.id] == document_analytics._extract_keywords(doc.content)
+            assert document_analytics.document_keywords[doc.id] == results[doc.id]
+            assert document_analytics.document_categories[doc.id] == "Financial"
+            assert doc.id in document_analytics.keyword_index["budget"]
+            assert any("analyzed and classified" in entry["entry_message"] for entry in doc.history)
+
+    def test_analyze_documents_in_process(self, document_analytics, document, user):
+        empty_doc = Document(title="Empty", content="", author=user, document_type=DocumentTypeEnum.LETTER)
+
+        results = document_analytics.analyze_documents([document, empty_doc])
+
+        assert list(results) == [document.id]
+        assert empty_doc.id not in document_analytics.document_keywords
+
+    def test_register_categories(self, document_analytics):
+        keywords = {"lawsuit", "courtroom"}
+
+        assert document_analytics._categorize_document(keywords) == "Legal"
+
+        document_analytics.register_categories({"Litigation": ["court", "lawsuit", "judge"]})
+        assert document_analytics._categorize_document(keywords) == "Litigation"
+
+        document_analytics.register_categories({"Finance": ["budget"]}, replace=True)
+        assert list(document_analytics.category_keywords) == ["Finance"]
+        assert document_analytics._categorize_document(keywords) == "Not Categorized"
+        assert document_analytics._categorize_document({"budgetary"}) == "Finance"
+
+    def test_reanalysis_removes_stale_postings(self, document_analytics, document, user):
+        document_analytics.analyze_document(document)
+        assert document.id in document_analytics.keyword_index["budget"]
+
+        document.update_content("Server network equipment maintenance schedule.", user)
+        keywords = document_analytics.analyze_document(document)
+
+        assert "budget" not in document_analytics.keyword_index
+        assert all(document.id in document_analytics.keyword_index[keyword] for keyword in keywords)
+        assert document_analytics.document_categories[document.id] == "Technical"
+
+    def test_remove_document(self, document_analytics, document, user):
+        other_doc = Document(
+            title="Budget Planning",
+            content="This document covers budget planning for the financial year.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        document_analytics.analyze_document(document)
+        document_analytics.analyze_document(other_doc)
+
+        document_analytics.remove_document(document.id)
+
+        assert document.id not in document_analytics.document_keywords
+        assert document.id not in document_analytics.document_categories
+        assert document.id not in document_analytics.document_signatures
+        assert all(document.id not in postings for postings in document_analytics.keyword_index.values())
+        assert "expense" not in document_analytics.keyword_index
+        assert document_analytics.find_related_documents(other_doc) == []
+
+    def test_iter_words_joins_words_across_chunks(self):
+        chunks = ["Budget plan", "ning, EXPE", "NSE_report", " fin"]
+
+        assert list(iter_words(chunks)) == ["budget", "planning", "expense_report", "fin"]
+
+    def test_extract_keywords_from_chunks(self, document_analytics, document):
+        content = document.content
+        chunks = [content[index:index + 7] for index in range(0, len(content), 7)]
+
+        assert document_analytics._extract_keywords(chunks) == document_analytics._extract_keywords(content)
+
+    def test_analyze_document_stream(self, document_analytics, document):
+        stream = io.StringIO(document.content * 100)
+
+        keywords = document_analytics.analyze_document_stream(document, stream, chunk_size=16)
+
+        assert keywords == document_analytics._extract_keywords(document.content)
+        assert document_analytics.document_keywords[document.id] == keywords
+        assert document_analytics.document_categories[document.id] == "Financial"
+
+    def test_analyze_empty_document_stream(self, document_analytics, document):
+        document_analytics.analyze_document(document)
+
+        keywords = document_analytics.analyze_document_stream(document, io.StringIO(""))
+
+        assert keywords == set()
+        assert document.id not in document_analytics.document_keywords
+        assert document.id not in document_analytics.document_categories
+        assert "budget" not in document_analytics.keyword_index
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 
 from enums import AccessLevelEnum, ReportTypeEnum, DocumentTypeEnum, WorkflowStatusEnum, DocumentStatusEnum
 from document_management_system import DocumentManagementSystem
+from models.document import Document
 
 
 class TestDocumentManagementSystem:
@@ -100,7 +101,7 @@ class TestDocumentManagementSystem:
         """
 
         dms.add_user(user)
-        dms._documents.append(document)
+        dms._documents.add(document)
 
         start_date = datetime.now() - timedelta(days=30)
         end_date = datetime.now()
@@ -143,7 +144,7 @@ class TestDocumentManagementSystem:
         """
 
         dms.add_user(user)
-        dms._documents.append(document)
+        dms._documents.add(document)
 
         dms._access_control.grant_access(document, user, AccessLevelEnum.READ_WRITE)
 
@@ -207,10 +208,33 @@ class TestDocumentManagementSystem:
 
         assert document.id in dms._version_control.documents
         assert "main" in dms._version_control.documents[document.id]
-        assert len(dms._version_control.documents[document.id]["main"]) == 1
-        assert dms._version_control.documents[document.id]["main"][0]["content"] == document.content
+        assert dms._version_control.documents[document.id]["main"].version_count == 1
+        assert dms._version_control.get_version_history(document, "main")[0]["content"] == document.content
         assert any("Version control system initialized" in entry["entry_message"] for entry in document.history)
 
+    def test_documents_after_restart_are_numbered_after_persisted_history(self, tmp_path, user, monkeypatch):
+        """
+        Test that documents created after a restart do not reuse the id of a persisted history.
+        """
+
+        storage_path = str(tmp_path / "versions")
+        DocumentManagementSystem._instances.pop(DocumentManagementSystem, None)
+        dms = DocumentManagementSystem(storage_path=storage_path)
+        dms.add_user(user)
+        old_document = dms.create_document("Old", "Old content", user, DocumentTypeEnum.CONTRACT)
+        dms._version_control.close()
+
+        # A new process starts counting document ids from scratch
+        monkeypatch.setattr(Document, "global_document_id", 0)
+        DocumentManagementSystem._instances.pop(DocumentManagementSystem, None)
+        restarted = DocumentManagementSystem(storage_path=storage_path)
+        restarted.add_user(user)
+        new_document = restarted.create_document("New", "New content", user, DocumentTypeEnum.CONTRACT)
+
+        assert new_document.id > old_document.id
+        assert restarted.get_document_version_history(new_document)[0]["content"] == "New content"
+        restarted._version_control.close()
+
     def test_create_branch(self, dms, user):
         """
         Test creating a branch from the main document version.
@@ -228,8 +252,8 @@ class TestDocumentManagementSystem:
 
         assert result is True
         assert "feature" in dms._version_control.documents[document.id]
-        assert len(dms._version_control.documents[document.id]["feature"]) == 1
-        assert dms._version_control.documents[document.id]["feature"][0]["content"] == document.content
+        assert dms._version_control.documents[document.id]["feature"].version_count == 1
+        assert dms._version_control.get_version_history(document, "feature")[0]["content"] == document.content
         assert any("Branch 'feature' created by" in entry["entry_message"] for entry in document.history)
 
     def test_commit_changes(self, dms, user):
@@ -249,9 +273,9 @@ class TestDocumentManagementSystem:
         result = dms.commit_changes(document, user, "Update content")
 
         assert result is True
-        assert len(dms._version_control.documents[document.id]["main"]) == 2
-        assert dms._version_control.documents[document.id]["main"][1]["content"] == "This is the updated content."
-        assert dms._version_control.documents[document.id]["main"][1]["description"] == "Update content"
+        assert dms._version_control.documents[document.id]["main"].version_count == 2
+        assert dms._version_control.get_version_history(document, "main")[1]["content"] == "This is the updated content."
+        assert dms._version_control.get_version_history(document, "main")[1]["description"] == "Update content"
         assert any("Version 2 saved in branch 'main'" in entry["entry_message"] for entry in document.history)
 
     def test_merge_branches(self, dms, user):
@@ -276,8 +300,8 @@ class TestDocumentManagementSystem:
 
         assert result is True
         assert "successfully" in message
-        assert len(dms._version_control.documents[document.id]["main"]) == 2
-        assert dms._version_control.documents[document.id]["main"][1][
+        assert dms._version_control.documents[document.id]["main"].version_count == 2
+        assert dms._version_control.get_version_history(document, "main")[1][
                    "content"] == "This is content on the feature branch."
 
         assert any("Merged branch 'feature' into 'main'" in entry["entry_message"] for entry in document.history)
@@ -313,13 +337,67 @@ class TestDocumentManagementSystem:
         assert history[2]["content"] == "Second update."
         assert history[2]["description"] == "Second change"
 
+    def test_get_document_version_history_page(self, dms, user):
+        """
+        Test reading one page of the version history, newest first and without content.
+        """
+        dms.add_user(user)
+        document = dms.create_document(
+            title="History Page Test",
+            content="This is the initial content.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT,
+        )
+        for index in range(1, 5):
+            document.content = f"Update {index}."
+            dms.commit_changes(document, user, f"Change {index}")
+
+        history = dms.get_document_version_history(
+            document, offset=1, limit=2, newest_first=True, include_content=False)
+
+        assert [entry["version"] for entry in history] == [4, 3]
+        assert all("content" not in entry for entry in history)
+
+    def test_get_document_diff(self, dms, user):
+        """
+        Test computing the differences between two versions of a document.
+        """
+        dms.add_user(user)
+        document = dms.create_document(
+            title="Diff Test",
+            content="First line.\nSecond line.\n",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT,
+        )
+        document.content = "First line.\nChanged line.\n"
+        dms.commit_changes(document, user, "Change the second line")
+
+        hunks = dms.get_document_diff(document, 1, 2)
+
+        assert hunks[0].lines == ((" ", "First line.\n"), ("-", "Second line.\n"), ("+", "Changed line.\n"))
+
+    def test_get_user_documents(self, dms, user):
+        """
+        Test listing the documents a user has access to.
+        """
+        dms.add_user(user)
+        first = dms.create_document(
+            title="First", content="First content.", author=user, document_type=DocumentTypeEnum.CONTRACT)
+        second = dms.create_document(
+            title="Second", content="Second content.", author=user, document_type=DocumentTypeEnum.CONTRACT)
+        dms._access_control.revoke_access(second, user)
+        dms._access_control.grant_access(second, user, AccessLevelEnum.READ_ONLY)
+
+        assert dms.get_user_documents(user) == [first, second]
+        assert dms.list_accessible_documents(user, AccessLevelEnum.OWNER) == [first]
+
     def test_export_document_to_external_system(self, dms, document, user):
         """
         Test exporting a document to an external system.
         """
 
         dms.add_user(user)
-        dms._documents.append(document)
+        dms._documents.add(document)
         result = dms.export_document_to_external_system(document, 'system1', user)
 
         assert result['success'] is True
@@ -349,3 +427,97 @@ class TestDocumentManagementSystem:
 
         if hasattr(dms, '_version_control'):
             assert document.id in dms._version_control.documents
+
+    def test_search_documents(self, dms, user):
+        """
+        Test searching documents through the maintained search index.
+        """
+
+        dms.add_user(user)
+        lease = dms.create_document(
+            title="Lease Agreement",
+            content="Agreement for office space rental.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT,
+        )
+        dms.create_document(
+            title="Annual Report",
+            content="Company activity report.",
+            author=user,
+            document_type=DocumentTypeEnum.LETTER,
+        )
+
+        dms._search_engine.set_criteria({"content": "rental"})
+        assert dms.search_documents() == [lease]
+
+        lease.update_content("Agreement for office space purchase.", user)
+        assert dms.search_documents() == []
+
+    def test_get_user_and_document_by_id(self, dms, user):
+        """
+        Test looking up users and documents through the id-keyed registries.
+        """
+
+        dms.add_user(user)
+        document = dms.create_document(
+            title="Lookup Test",
+            content="Registry lookup content.",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT,
+        )
+
+        assert dms.get_user(user.id) is user
+        assert dms.get_user_by_username(user.username) is user
+        assert dms.get_document(document.id) is document
+        assert dms.get_document(-1) is None
+
+        dms.remove_user(user.id)
+        assert dms.get_user(user.id) is None
+        assert dms.get_user_by_username(user.username) is None
+
+    def test_find_document_duplicates(self, dms, user):
+        """
+        Test resolving duplicate document ids to registered documents.
+        """
+
+        dms.add_user(user)
+        content = "Budget planning and expense analysis for the financial year."
+        original = dms.create_document("Budget", content, user, DocumentTypeEnum.POLICY)
+        duplicate = dms.create_document("Budget copy", content, user, DocumentTypeEnum.POLICY)
+
+        assert dms.find_document_duplicates(original) == [duplicate]
+
+    def test_find_top_related_documents(self, dms, user):
+        """
+        Test resolving ranked related documents to registered documents.
+        """
+
+        dms.add_user(user)
+        document = dms.create_document(
+            "Budget", "Budget planning and expense analysis.", user, DocumentTypeEnum.POLICY
+        )
+        related = dms.create_document(
+            "Expenses", "Expense analysis for the budget committee.", user, DocumentTypeEnum.POLICY
+        )
+        dms.create_document("Servers", "Server network maintenance.", user, DocumentTypeEnum.POLICY)
+
+        assert dms.find_top_related_documents(document, top_k=3) == [related]
+
+    def test_update_content_refreshes_analytics(self, dms, user):
+        """
+        Test that content updates re-analyze the document incrementally.
+        """
+
+        dms.add_user(user)
+        document = dms.create_document(
+            "Budget", "Budget planning and expense analysis.", user, DocumentTypeEnum.POLICY
+        )
+        other = dms.create_document(
+            "Expenses", "Expense analysis for the budget committee.", user, DocumentTypeEnum.POLICY
+        )
+        assert dms.find_related_documents(other) == [document]
+
+        document.update_content("Server network maintenance.", user)
+
+        assert dms.find_related_documents(other) == []
+        assert "budget" not in dms._document_analytics.document_keywords[document.id]
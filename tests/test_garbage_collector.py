@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.version_control.garbage_collector import GarbageCollector, RetentionPolicy
+from services.version_control.version_control_system import VersionControl
+
+
+class TestGarbageCollector:
+    @pytest.fixture
+    def version_control(self):
+        return VersionControl(keyframe_interval=4)
+
+    @pytest.fixture
+    def later(self):
+        return lambda: datetime.now() + timedelta(days=30)
+
+    def _commit(self, version_control, document, user, content):
+        document.content = content
+        version_control.commit_changes(document, user, "Update")
+
+    def test_deletes_merged_branches(self, version_control, document, user):
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        version_control.create_branch(document, "draft", user)
+        version_control.switch_branch(document, "feature", user)
+        self._commit(version_control, document, user, "Feature content")
+        version_control.switch_branch(document, "draft", user)
+        self._commit(version_control, document, user, "Draft content")
+        version_control.switch_branch(document, "main", user)
+        version_control.merge_branches(document, "feature", "main", user)
+
+        report = GarbageCollector(version_control).run()
+
+        assert report["branches_deleted"] == 1
+        assert report["complete"] is True
+        assert version_control.get_document_branches(document) == ["main", "draft"]
+
+    def test_prunes_old_versions_and_reclaims_blobs(self, version_control, document, user, later):
+        version_control.initialize_version_control(document)
+        contents = [document.content]
+        for index in range(1, 10):
+            self._commit(version_control, document, user, contents[-1] + f"\nClause {index}.")
+            contents.append(document.content)
+        blob_count = len(version_control.blob_store)
+
+        report = GarbageCollector(
+            version_control, RetentionPolicy(max_age=timedelta(days=7), keep_latest=3), clock=later).run()
+
+        history = version_control.get_version_history(document)
+        keyframe_digest = version_control.documents[document.id]["main"].versions[0].content_digest
+        assert report["versions_pruned"] == 6
+        assert report["blobs_deleted"] == 6
+        assert report["reclaimed_bytes"] > 0
+        assert len(version_control.blob_store) == blob_count - 6
+        assert [entry["version"] for entry in history] == [7, 8, 9, 10]
+        assert [entry["content"] for entry in history] == contents[6:]
+        assert version_control.blob_store.get_base(keyframe_digest) is None
+        assert version_control.get_version_content(document, 2) is None
+
+    def test_keeps_versions_needed_for_merge_bases(self, version_control, document, user, later):
+        document.content = "A\nB\nC\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        for content in ("A\nB\nC1\n", "A\nB\nC2\n", "A\nB\nC3\n"):
+            self._commit(version_control, document, user, content)
+
+        GarbageCollector(
+            version_control,
+            RetentionPolicy(max_age=timedelta(days=7), keep_latest=1, delete_merged_branches=False),
+            clock=later,
+        ).run()
+        version_control.switch_branch(document, "feature", user)
+        self._commit(version_control, document, user, "A1\nB\nC\n")
+        result, _ = version_control.merge_branches(document, "feature", "main", user)
+
+        assert [entry["version"] for entry in version_control.get_version_history(document, "main")] == [1, 3, 4, 5]
+        assert result is True
+        assert version_control.get_version_content(document, 5, "main") == "A1\nB\nC3\n"
+
+    def test_collect_is_bounded(self, version_control, document, user, later):
+        version_control.initialize_version_control(document)
+        for index in range(1, 10):
+            self._commit(version_control, document, user, f"Content {index}")
+        collector = GarbageCollector(
+            version_control, RetentionPolicy(max_age=timedelta(days=7), keep_latest=1), max_work=2, clock=later)
+
+        reports = []
+        while not reports or not reports[-1]["complete"]:
+            reports.append(collector.collect())
+
+        assert len(reports) > 5
+        assert sum(report["versions_pruned"] for report in reports) == 8
+        assert version_control.get_version_content(document, 10) == "Content 9"
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            RetentionPolicy(keep_latest=0)
+
+    def test_collection_persists_across_restart(self, tmp_path, document, user, later):
+        storage_path = str(tmp_path / "versions")
+        version_control = VersionControl(keyframe_interval=4, storage_path=storage_path)
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        version_control.switch_branch(document, "feature", user)
+        self._commit(version_control, document, user, "Feature content")
+        version_control.switch_branch(document, "main", user)
+        version_control.merge_branches(document, "feature", "main", user)
+        for index in range(1, 6):
+            self._commit(version_control, document, user, f"Main content {index}")
+
+        pack_size = version_control.blob_store.packfile.get_size()
+
+        report = GarbageCollector(
+            version_control, RetentionPolicy(max_age=timedelta(days=7), keep_latest=2), clock=later).run()
+        assert report["reclaimed_bytes"] == pack_size - version_control.blob_store.packfile.get_size()
+        assert report["reclaimed_bytes"] > 0
+        version_control.close()
+        restarted = VersionControl(keyframe_interval=4, storage_path=storage_path)
+
+        history = restarted.get_version_history(document)
+        assert restarted.get_document_branches(document) == ["main"]
+        assert [entry["version"] for entry in history] == [5, 6, 7]
+        assert [entry["content"] for entry in history] == ["Main content 3", "Main content 4", "Main content 5"]
+        restarted.close()
@@ -0,0 +1,43 @@
+import pytest
+
+from models.group import Group
+from models.user import User
+
+
+class TestGroup:
+    @pytest.fixture
+    def second_user(self, user_data):
+        return User(
+            username=user_data["username"] + "_2",
+            password=user_data["password"],
+            position=user_data["position"],
+            department=None,
+            access_level=user_data["access_level"]
+        )
+
+    def test_create_object(self, user):
+        group = Group(name="Reviewers", members=[user])
+        other_group = Group(name="Editors")
+
+        assert group.name == "Reviewers"
+        assert group.members == [user]
+        assert other_group.members == []
+        assert other_group.id == group.id + 1
+
+    def test_membership_observers(self, user, second_user):
+        group = Group(name="Reviewers", members=[user])
+        changes = []
+        group.add_membership_observer(lambda changed_group, member, is_member: changes.append((member, is_member)))
+
+        group.add_member(second_user)
+        group.remove_member(user)
+
+        assert changes == [(second_user, True), (user, False)]
+
+    def test_remove_nonexistent_member(self, user):
+        group = Group(name="Reviewers")
+
+        with pytest.raises(ValueError) as error:
+            group.remove_member(user)
+
+        assert f"{user.username} is not a member of this group." in str(error.value)
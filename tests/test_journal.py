@@ -0,0 +1,37 @@
+import os
+
+from services.version_control.journal import Journal
+
+
+class TestJournal:
+    def test_replays_records_in_order(self, tmp_path):
+        path = str(tmp_path / "versions.journal")
+        journal = Journal(path)
+        journal.append({"type": "active", "document_id": 1, "branch": "main"})
+        journal.append({"type": "active", "document_id": 1, "branch": "feature"})
+        journal.close()
+
+        reopened = Journal(path)
+
+        assert [record["branch"] for record in reopened] == ["main", "feature"]
+        reopened.close()
+
+    def test_discards_torn_record(self, tmp_path):
+        path = str(tmp_path / "versions.journal")
+        journal = Journal(path)
+        journal.append({"type": "active", "document_id": 1, "branch": "main"})
+        journal.append({"type": "active", "document_id": 1, "branch": "feature"})
+        journal.close()
+
+        with open(path, "rb+") as journal_file:
+            journal_file.truncate(os.path.getsize(path) - 3)
+
+        reopened = Journal(path)
+        assert [record["branch"] for record in reopened] == ["main"]
+        reopened.append({"type": "active", "document_id": 1, "branch": "review"})
+        reopened.close()
+
+        reopened = Journal(path)
+
+        assert [record["branch"] for record in reopened] == ["main", "review"]
+        reopened.close()
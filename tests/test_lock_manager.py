@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from enums import LockModeEnum
+from services.version_control.lock_manager import LockManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLockManager:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def lock_manager(self, clock):
+        return LockManager(default_ttl=10, clock=clock)
+
+    def test_exclusive_lock(self, lock_manager):
+        lease = lock_manager.acquire(1, 100)
+
+        assert lease.mode == LockModeEnum.EXCLUSIVE
+        assert lock_manager.acquire(1, 200) is None
+        assert lock_manager.acquire(1, 200, mode=LockModeEnum.SHARED) is None
+        assert lock_manager.acquire(2, 200) is not None
+
+    def test_shared_locks(self, lock_manager):
+        assert lock_manager.acquire(1, 100, mode=LockModeEnum.SHARED) is not None
+        assert lock_manager.acquire(1, 200, mode=LockModeEnum.SHARED) is not None
+        assert lock_manager.acquire(1, 300) is None
+        assert lock_manager.acquire(1, 100) is None
+
+        lock_manager.release(1, 200)
+
+        assert lock_manager.acquire(1, 100).mode == LockModeEnum.EXCLUSIVE
+
+    def test_lease_expires(self, lock_manager, clock):
+        lock_manager.acquire(1, 100)
+        clock.now = 9
+
+        assert lock_manager.acquire(1, 200) is None
+
+        clock.now = 10
+
+        assert lock_manager.is_locked(1) is False
+        assert lock_manager.acquire(1, 200) is not None
+
+    def test_renew_extends_lease(self, lock_manager, clock):
+        lock_manager.acquire(1, 100)
+        clock.now = 8
+
+        assert lock_manager.renew(1, 100) is True
+        assert lock_manager.renew(1, 200) is False
+
+        clock.now = 15
+        assert lock_manager.sweep_expired() == 0
+        assert lock_manager.get_leases(1)[100].expires_at == 18
+
+        clock.now = 18
+        assert lock_manager.sweep_expired() == 1
+        assert lock_manager.renew(1, 100) is False
+
+    def test_release(self, lock_manager):
+        lock_manager.acquire(1, 100)
+
+        assert lock_manager.release(1, 200) is False
+        assert lock_manager.release(1, 100) is True
+        assert lock_manager.locks == {}
+
+    def test_wait_for_release(self):
+        lock_manager = LockManager(default_ttl=10)
+        lock_manager.acquire(1, 100)
+        releaser = threading.Timer(0.05, lock_manager.release, args=(1, 100))
+        releaser.start()
+
+        lease = lock_manager.acquire(1, 200, timeout=5)
+        releaser.join()
+
+        assert lease is not None
+        assert lease.holder_id == 200
+
+    def test_wait_times_out(self):
+        lock_manager = LockManager(default_ttl=10)
+        lock_manager.acquire(1, 100)
+
+        assert lock_manager.acquire(1, 200, timeout=0.05) is None
+
+    def test_wait_for_expiry(self):
+        lock_manager = LockManager(default_ttl=0.05)
+        lock_manager.acquire(1, 100)
+
+        assert lock_manager.acquire(1, 200, timeout=5) is not None
+
+    def test_timeout_uses_injected_clock(self, lock_manager, clock):
+        lock_manager.acquire(1, 100)
+        waits = []
+
+        def wait(timeout=None):
+            # Waiting lets the fake time pass instead of the real time
+            waits.append(timeout)
+            clock.now += timeout
+
+        lock_manager._condition.wait = wait
+
+        assert lock_manager.acquire(1, 200, timeout=3) is None
+        assert waits == [3]
+        assert lock_manager.acquire(1, 200, timeout=30) is not None
+        assert waits == [3, 7]
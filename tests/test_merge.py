@@ -0,0 +1,51 @@
+from services.version_control.merge import merge_three_way
+
+BASE = "Parties\nTerm: one year\nDeposit: none\nRent: 100\nSignatures\n"
+
+
+class TestMergeThreeWay:
+    def test_non_overlapping_changes_are_combined(self):
+        source = BASE.replace("Term: one year", "Term: two years")
+        target = BASE.replace("Rent: 100", "Rent: 120")
+
+        merged, conflicts = merge_three_way(BASE, source, target)
+
+        assert merged == "Parties\nTerm: two years\nDeposit: none\nRent: 120\nSignatures\n"
+        assert conflicts == []
+
+    def test_one_sided_change_wins(self):
+        source = BASE + "Appendix\n"
+
+        assert merge_three_way(BASE, source, BASE) == (source, [])
+        assert merge_three_way(BASE, BASE, source) == (source, [])
+
+    def test_identical_changes_do_not_conflict(self):
+        changed = BASE.replace("Rent: 100", "Rent: 150")
+
+        assert merge_three_way(BASE, changed, changed) == (changed, [])
+
+    def test_conflicting_changes(self):
+        source = BASE.replace("Rent: 100", "Rent: 150")
+        target = BASE.replace("Rent: 100", "Rent: 120")
+
+        merged, conflicts = merge_three_way(BASE, source, target, source_label="feature", target_label="main")
+
+        assert merged == (
+            "Parties\nTerm: one year\nDeposit: none\n"
+            "<<<<<<< main\nRent: 120\n=======\nRent: 150\n>>>>>>> feature\n"
+            "Signatures\n"
+        )
+        assert len(conflicts) == 1
+        assert conflicts[0].line_number == 4
+        assert conflicts[0].base_lines == ["Rent: 100\n"]
+        assert conflicts[0].source_lines == ["Rent: 150\n"]
+        assert conflicts[0].target_lines == ["Rent: 120\n"]
+
+    def test_adjacent_changes_conflict(self):
+        source = BASE.replace("Deposit: none", "Deposit: 200")
+        target = BASE.replace("Rent: 100", "Rent: 120")
+
+        merged, conflicts = merge_three_way(BASE, source, target)
+
+        assert len(conflicts) == 1
+        assert conflicts[0].base_lines == ["Deposit: none\n", "Rent: 100\n"]
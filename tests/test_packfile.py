@@ -0,0 +1,108 @@
+import os
+
+from services.version_control.packfile import Packfile
+
+
+class TestPackfile:
+    def test_append_and_read(self, tmp_path):
+        packfile = Packfile(str(tmp_path / "objects.pack"))
+
+        packfile.append("first", b"Contract text")
+        packfile.append("second", b"Amended contract text")
+
+        assert "first" in packfile
+        assert len(packfile) == 2
+        assert packfile.read("first") == b"Contract text"
+        assert packfile.read("second") == b"Amended contract text"
+        packfile.close()
+
+    def test_reopen_reads_index(self, tmp_path):
+        path = str(tmp_path / "objects.pack")
+        packfile = Packfile(path)
+        packfile.append("first", b"Contract text " * 100)
+        packfile.close()
+
+        reopened = Packfile(path)
+
+        assert list(reopened.keys()) == ["first"]
+        assert reopened.read("first") == b"Contract text " * 100
+        assert reopened.get_size() < len(b"Contract text " * 100)
+        reopened.close()
+
+    def test_rewritten_key_reads_newest_record(self, tmp_path):
+        packfile = Packfile(str(tmp_path / "objects.pack"))
+
+        packfile.append("active", b"main")
+        packfile.append("active", b"feature")
+
+        assert len(packfile) == 1
+        assert packfile.read("active") == b"feature"
+        packfile.close()
+
+    def test_recovers_records_missing_from_index(self, tmp_path):
+        path = str(tmp_path / "objects.pack")
+        packfile = Packfile(path)
+        packfile.append("first", b"Contract text")
+        packfile.append("second", b"Amended contract text")
+        packfile.close()
+
+        with open(path + ".idx") as index:
+            first_entry = index.readline()
+        with open(path + ".idx", "w") as index:
+            index.write(first_entry)
+        with open(path, "ab") as pack:
+            pack.write(b"\x00\x05tor")
+        size_with_torn_tail = os.path.getsize(path)
+
+        reopened = Packfile(path)
+
+        assert reopened.read("second") == b"Amended contract text"
+        assert os.path.getsize(path) == size_with_torn_tail - 5
+        reopened.close()
+
+    def test_discards_torn_index_entry(self, tmp_path):
+        path = str(tmp_path / "objects.pack")
+        packfile = Packfile(path)
+        packfile.append("first", b"Contract text")
+        packfile.append("second", b"Amended contract text")
+        packfile.close()
+
+        with open(path + ".idx", "rb+") as index:
+            index.truncate(os.path.getsize(path + ".idx") - 3)
+
+        reopened = Packfile(path)
+        reopened.append("third", b"Signed contract text")
+        reopened.close()
+
+        reopened = Packfile(path)
+
+        assert list(reopened.keys()) == ["first", "second", "third"]
+        assert reopened.read("second") == b"Amended contract text"
+        assert reopened.read("third") == b"Signed contract text"
+        reopened.close()
+
+    def test_compact_drops_deleted_and_shadowed_records(self, tmp_path):
+        path = str(tmp_path / "objects.pack")
+        packfile = Packfile(path)
+        packfile.append("draft", b"Draft contract text " * 50)
+        packfile.append("active", b"main")
+        packfile.append("active", b"feature")
+        packfile.append("signed", b"Signed contract text")
+        packfile.delete("draft")
+        live_size = packfile.get_record_size("active") + packfile.get_record_size("signed")
+        size_before = packfile.get_size()
+
+        freed = packfile.compact()
+
+        assert freed == size_before - live_size
+        assert packfile.get_size() == live_size
+        assert packfile.read("active") == b"feature"
+        packfile.append("archived", b"Archived contract text")
+        packfile.close()
+
+        reopened = Packfile(path)
+
+        assert list(reopened.keys()) == ["active", "signed", "archived"]
+        assert reopened.read("signed") == b"Signed contract text"
+        assert reopened.read("archived") == b"Archived contract text"
+        reopened.close()
@@ -0,0 +1,57 @@
+import pytest
+
+from models.registry import Registry
+from models.user import User
+
+
+class TestRegistry:
+    @pytest.fixture
+    def second_user(self, user_data):
+        return User(
+            username=user_data["username"] + "_2",
+            password=user_data["password"],
+            position=user_data["position"],
+            department=None,
+            access_level=user_data["access_level"],
+        )
+
+    def test_add_and_get(self, user, second_user):
+        registry = Registry(unique_attributes=('username',))
+        registry.add(user)
+        registry.add(second_user)
+
+        assert len(registry) == 2
+        assert registry.get(user.id) is user
+        assert registry.get_by('username', second_user.username) is second_user
+        assert user in registry
+        assert list(registry) == [user, second_user]
+
+    def test_add_duplicate(self, user):
+        registry = Registry(unique_attributes=('username',))
+        registry.add(user)
+
+        with pytest.raises(ValueError):
+            registry.add(user)
+
+    def test_add_duplicate_unique_attribute(self, user, user_data):
+        registry = Registry(unique_attributes=('username',))
+        registry.add(user)
+        namesake = User(
+            username=user_data["username"],
+            password=user_data["password"],
+            position=user_data["position"],
+            department=None,
+            access_level=user_data["access_level"],
+        )
+
+        with pytest.raises(ValueError):
+            registry.add(namesake)
+
+    def test_remove(self, user):
+        registry = Registry(unique_attributes=('username',))
+        registry.add(user)
+
+        assert registry.remove(user.id) is user
+        assert registry.remove(user.id) is None
+        assert user not in registry
+        assert registry.get_by('username', user.username) is None
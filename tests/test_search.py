@@ -131,3 +131,59 @@ class TestSearch:
 
         all_results = search.execute_search(documents=test_documents)
         assert len(all_results) == len(test_documents)
+
+    def test_execute_search_uses_index(self, test_documents):
+        search = Search(criteria={"content": "report"})
+        for document in test_documents:
+            search.index_document(document)
+
+        results = search.execute_search()
+
+        assert results == [test_documents[0], test_documents[2]]
+
+    def test_index_follows_content_updates(self, test_documents, user):
+        search = Search(criteria={"content": "rental"})
+        for document in test_documents:
+            search.index_document(document)
+            document.add_content_observer(search.index_document)
+
+        assert search.execute_search() == [test_documents[1]]
+
+        test_documents[0].update_content(new_content="Rental terms for the new office", editor=user)
+        test_documents[1].content = "Agreement for office space purchase"
+
+        assert search.execute_search() == [test_documents[0]]
+
+    def test_remove_document_from_index(self, test_documents):
+        search = Search(criteria={"title": "report"})
+        for document in test_documents:
+            search.index_document(document)
+
+        search.remove_document(test_documents[0].id)
+
+        assert search.execute_search() == [test_documents[2]]
+
+    def test_substring_mode(self, test_documents):
+        search = Search(criteria={"content": "agree"}, mode=Search.SUBSTRING_MODE)
+        for document in test_documents:
+            search.index_document(document)
+
+        assert search.execute_search() == [test_documents[1]]
+        assert Search(criteria={"content": "agree"}).execute_search(documents=test_documents) == []
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            Search(mode="regex")
+
+    def test_indexed_title_and_author_substring_search(self, test_documents, user):
+        search = Search(criteria={"title": "port", "author": "EST_US"})
+        for document in test_documents:
+            search.index_document(document)
+
+        assert search.execute_search() == [test_documents[0], test_documents[2]]
+
+        search.set_criteria({"title": "ly"})
+        assert search.execute_search() == [test_documents[2]]
+
+        search.set_criteria({"author": "nobody"})
+        assert search.execute_search() == []
@@ -0,0 +1,73 @@
+from models.search_index import InvertedIndex, TrigramIndex, tokenize, trigrams
+
+
+class TestInvertedIndex:
+    def test_tokenize(self):
+        assert tokenize("Lease Agreement, 2023!") == {"lease", "agreement", "2023"}
+        assert tokenize("") == set()
+
+    def test_lookup_intersects_terms(self):
+        index = InvertedIndex()
+        index.add(1, "office lease agreement")
+        index.add(2, "lease of equipment")
+        index.add(3, "service agreement")
+
+        assert index.lookup("lease") == {1, 2}
+        assert index.lookup("Agreement LEASE") == {1}
+        assert index.lookup("missing") == set()
+        assert index.lookup("") is None
+
+    def test_reindex_drops_stale_terms(self):
+        index = InvertedIndex()
+        index.add(1, "draft contract")
+        index.add(1, "final contract")
+
+        assert index.lookup("draft") == set()
+        assert index.lookup("final") == {1}
+        assert "draft" not in index.postings
+
+    def test_remove(self):
+        index = InvertedIndex()
+        index.add(1, "contract")
+        index.add(2, "contract")
+        index.remove(1)
+
+        assert index.lookup("contract") == {2}
+        assert 1 not in index.document_terms
+
+
+class TestTrigramIndex:
+    def test_trigrams(self):
+        assert trigrams("lease") == {"lea", "eas", "ase"}
+        assert trigrams("ab") == set()
+
+    def test_search_verifies_candidates(self):
+        index = TrigramIndex()
+        index.add(1, "Annual Report")
+        index.add(2, "Quarterly Report")
+        index.add(3, "Report on ports")
+
+        assert index.search("report") == {1, 2, 3}
+        assert index.search("PORT") == {1, 2, 3}
+        assert index.search("ual rep") == {1}
+        assert index.search("portx") == set()
+
+    def test_short_query_falls_back_to_scan(self):
+        index = TrigramIndex()
+        index.add(1, "Annual Report")
+        index.add(2, "Lease")
+
+        assert index.search("ea") == {2}
+        assert index.search("") == {1, 2}
+
+    def test_update_and_remove(self):
+        index = TrigramIndex()
+        index.add(1, "Draft")
+        index.add(1, "Final")
+
+        assert index.search("dra") == set()
+        assert index.search("fin") == {1}
+
+        index.remove(1)
+        assert index.search("fin") == set()
+        assert index.postings == {}
@@ -36,3 +36,28 @@ class TestUser:
         new_access_level = AccessLevelEnum.READ_WRITE
         user.change_access_level(new_access_level)
         assert user.access_level == new_access_level
+
+    def test_unique_ids(self, user, user_data):
+        other_user = User(
+            username=user_data["username"] + "_other",
+            password=user_data["password"],
+            position=user_data["position"],
+            department=None,
+            access_level=user_data["access_level"],
+        )
+
+        assert other_user.id != user.id
+
+    def test_add_and_remove_document(self, user, document):
+        user.add_document(document)
+        user.add_document(document)
+
+        assert len(user.documents) == 1
+        assert document in user.documents
+        assert user.documents == [document]
+        assert not hasattr(user.documents, "append")
+
+        user.remove_document(document)
+
+        assert document not in user.documents
+        assert user.documents == []
@@ -2,8 +2,10 @@ import pytest
 
 from models.document import Document
 from models.user import User
+from services.version_control import version_control_system
+from services.version_control.lock_manager import LockManager
 from services.version_control.version_control_system import VersionControl
-from enums import DocumentTypeEnum, PositionEnum, AccessLevelEnum
+from enums import DocumentTypeEnum, PositionEnum, AccessLevelEnum, LockModeEnum
 
 
 class TestVersionControl:
@@ -47,15 +49,15 @@ class TestVersionControl:
         assert isinstance(version_control, VersionControl)
         assert isinstance(version_control.documents, dict)
         assert isinstance(version_control.active_branches, dict)
-        assert isinstance(version_control.locks, dict)
+        assert isinstance(version_control.lock_manager, LockManager)
 
     def test_initialize_version_control(self, version_control, document):
         version_control.initialize_version_control(document)
 
         assert document.id in version_control.documents
         assert "main" in version_control.documents[document.id]
-        assert len(version_control.documents[document.id]["main"]) == 1
-        assert version_control.documents[document.id]["main"][0]["content"] == document.content
+        assert version_control.documents[document.id]["main"].version_count == 1
+        assert version_control.get_version_history(document, "main")[0]["content"] == document.content
         assert document.id in version_control.active_branches
         assert version_control.active_branches[document.id] == "main"
         assert any("Version control system initialized" in entry["entry_message"] for entry in document.history)
@@ -66,8 +68,8 @@ class TestVersionControl:
 
         assert result is True
         assert "feature" in version_control.documents[document.id]
-        assert len(version_control.documents[document.id]["feature"]) == 1
-        assert version_control.documents[document.id]["feature"][0]["content"] == document.content
+        assert version_control.documents[document.id]["feature"].version_count == 1
+        assert version_control.get_version_history(document, "feature")[0]["content"] == document.content
         assert any("Branch 'feature' created by" in entry["entry_message"] for entry in document.history)
 
     def test_switch_branch(self, version_control, document, user):
@@ -94,9 +96,9 @@ class TestVersionControl:
         result = version_control.commit_changes(document, user, "Update content")
 
         assert result is True
-        assert len(version_control.documents[document.id]["main"]) == 2
-        assert version_control.documents[document.id]["main"][1]["content"] == "This is the updated content."
-        assert version_control.documents[document.id]["main"][1]["description"] == "Update content"
+        assert version_control.documents[document.id]["main"].version_count == 2
+        assert version_control.get_version_history(document, "main")[1]["content"] == "This is the updated content."
+        assert version_control.get_version_history(document, "main")[1]["description"] == "Update content"
         assert document.version == 2
         assert any("Version 2 saved in branch 'main' by" in entry["entry_message"] for entry in document.history)
 
@@ -111,9 +113,9 @@ class TestVersionControl:
 
         assert result is True
         assert "Merge completed successfully" in message
-        assert len(version_control.documents[document.id]["main"]) == 2
-        assert version_control.documents[document.id]["main"][1]["content"] == "This is content on the feature branch."
-        assert "Merged from branch 'feature'" in version_control.documents[document.id]["main"][1]["description"]
+        assert version_control.documents[document.id]["main"].version_count == 2
+        assert version_control.get_version_history(document, "main")[1]["content"] == "This is content on the feature branch."
+        assert "Merged from branch 'feature'" in version_control.get_version_history(document, "main")[1]["description"]
         assert any("Merged branch 'feature' into 'main' by" in entry["entry_message"] for entry in document.history)
 
     def test_get_version_history(self, version_control, document, user):
@@ -133,3 +135,331 @@ class TestVersionControl:
         assert history[1]["content"] == "This is the first update."
         assert history[2]["version"] == 3
         assert history[2]["content"] == "This is the second update."
+
+    def test_versions_store_keyframes_and_deltas(self, document, user):
+        version_control = VersionControl(keyframe_interval=3)
+        version_control.initialize_version_control(document)
+        contents = [document.content]
+        for index in range(1, 7):
+            document.content = contents[-1] + f"\nClause {index}."
+            contents.append(document.content)
+            version_control.commit_changes(document, user, f"Add clause {index}")
+
+        versions = version_control.documents[document.id]["main"].versions
+        blobs = version_control.blob_store.blobs
+
+        assert ["snapshot" in blobs[version.content_digest] for version in versions] == [
+            True, False, False, True, False, False, True
+        ]
+        assert [entry["content"] for entry in version_control.get_version_history(document)] == contents
+        assert version_control.get_version_content(document, 6) == contents[5]
+        assert version_control.get_version_content(document, 8) is None
+
+    def test_checkout_version(self, version_control, document, user):
+        version_control.initialize_version_control(document)
+        document.content = "This is the first update."
+        version_control.commit_changes(document, user, "First update")
+
+        result = version_control.checkout_version(document, 1, user)
+
+        assert result is True
+        assert document.content == "This is the initial content."
+        assert version_control.checkout_version(document, 3, user) is False
+
+    def test_identical_content_is_stored_once(self, version_control, document, user):
+        copy = Document(
+            title="Copy",
+            content=document.content,
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        version_control.initialize_version_control(document)
+        version_control.initialize_version_control(copy)
+        version_control.create_branch(document, "feature", user)
+        version_control.create_branch(document, "review", user)
+
+        assert len(version_control.blob_store) == 1
+        digests = {
+            version_control.documents[doc.id][branch].versions[0].content_digest
+            for doc, branch in ((document, "main"), (document, "feature"), (document, "review"), (copy, "main"))
+        }
+        assert len(digests) == 1
+
+    def test_merge_identical_branches(self, version_control, document, user):
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+
+        result, message = version_control.merge_branches(document, "feature", "main", user)
+
+        assert result is True
+        assert "identical" in message
+        assert len(version_control.get_version_history(document, "main")) == 1
+
+    def _commit_on(self, version_control, document, user, branch_name, content):
+        version_control.switch_branch(document, branch_name, user)
+        document.content = content
+        version_control.commit_changes(document, user, f"Update {branch_name}")
+
+    def test_three_way_merge_keeps_both_sides(self, version_control, document, user):
+        document.content = "Parties\nTerm: one year\nDeposit: none\nRent: 100\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(
+            version_control, document, user, "feature", "Parties\nTerm: two years\nDeposit: none\nRent: 100\n")
+        self._commit_on(
+            version_control, document, user, "main", "Parties\nTerm: one year\nDeposit: none\nRent: 120\n")
+
+        result, message = version_control.merge_branches(document, "feature", "main", user)
+
+        assert result is True
+        assert version_control.get_version_content(document, 3, "main") == (
+            "Parties\nTerm: two years\nDeposit: none\nRent: 120\n")
+        assert version_control.get_version_history(document, "main")[-1]["merged_from"] == "feature"
+
+    def test_merge_conflict_and_resolution(self, version_control, document, user):
+        document.content = "Parties\nRent: 100\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(version_control, document, user, "feature", "Parties\nRent: 150\n")
+        self._commit_on(version_control, document, user, "main", "Parties\nRent: 120\n")
+
+        result, message = version_control.merge_branches(document, "feature", "main", user)
+
+        assert result is False
+        assert "conflicts" in message
+        assert len(version_control.get_version_history(document, "main")) == 2
+        conflicts = version_control.get_merge_conflicts(document)
+        assert [conflict.source_lines for conflict in conflicts] == [["Rent: 150\n"]]
+        assert "<<<<<<< main" in version_control.pending_merges[document.id]["content"]
+
+        assert version_control.resolve_conflict(document, "Parties\nRent: 135\n", user, "Split the difference")
+        assert version_control.get_merge_conflicts(document) == []
+        assert document.content == "Parties\nRent: 135\n"
+        assert version_control.get_version_history(document, "main")[-1]["merged_from"] == "feature"
+
+        result, message = version_control.merge_branches(document, "feature", "main", user)
+        assert result is True
+        assert "already contains" in message
+
+    def test_pending_merge_persists_across_restart(self, tmp_path, document, user):
+        storage_path = str(tmp_path / "versions")
+        version_control = VersionControl(storage_path=storage_path)
+        document.content = "Parties\nRent: 100\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(version_control, document, user, "feature", "Parties\nRent: 150\n")
+        self._commit_on(version_control, document, user, "main", "Parties\nRent: 120\n")
+        version_control.merge_branches(document, "feature", "main", user)
+        version_control.close()
+
+        restarted = VersionControl(storage_path=storage_path)
+
+        conflicts = restarted.get_merge_conflicts(document)
+        assert [conflict.source_lines for conflict in conflicts] == [["Rent: 150\n"]]
+        assert restarted.resolve_conflict(document, "Parties\nRent: 135\n", user, "Split the difference")
+        assert restarted.get_version_history(document, "main")[-1]["merged_from"] == "feature"
+        restarted.close()
+
+        reopened = VersionControl(storage_path=storage_path)
+        assert reopened.get_merge_conflicts(document) == []
+        reopened.close()
+
+    def test_resolution_rejected_after_target_changes(self, version_control, document, user):
+        document.content = "Parties\nRent: 100\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(version_control, document, user, "feature", "Parties\nRent: 150\n")
+        self._commit_on(version_control, document, user, "main", "Parties\nRent: 120\n")
+        version_control.merge_branches(document, "feature", "main", user)
+        self._commit_on(version_control, document, user, "main", "Parties\nRent: 125\n")
+
+        assert version_control.resolve_conflict(document, "Parties\nRent: 135\n", user, "Stale") is False
+        assert version_control.get_version_content(document, 3, "main") == "Parties\nRent: 125\n"
+        assert version_control.get_version_count(document, "main") == 3
+        assert version_control.get_merge_conflicts(document) == []
+
+    def test_repeated_merges_use_latest_merge_base(self, version_control, document, user):
+        document.content = "A\nB\nC\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(version_control, document, user, "feature", "A1\nB\nC\n")
+        version_control.merge_branches(document, "feature", "main", user)
+        self._commit_on(version_control, document, user, "main", "A1\nB\nC1\n")
+        self._commit_on(version_control, document, user, "feature", "A2\nB\nC\n")
+
+        result, _ = version_control.merge_branches(document, "feature", "main", user)
+
+        assert result is True
+        assert version_control.get_version_history(document, "main")[-1]["content"] == "A2\nB\nC1\n"
+
+    def test_branches_track_head_and_ancestors(self, version_control, document, user):
+        version_control.initialize_version_control(document)
+        document.content = "This is the first update."
+        version_control.commit_changes(document, user, "First update")
+        version_control.create_branch(document, "feature", user)
+
+        main = version_control.documents[document.id]["main"]
+        feature = version_control.documents[document.id]["feature"]
+
+        assert main.head.number == 2
+        assert feature.head.content_digest == main.head.content_digest
+        assert feature.parent_branch_name == "main"
+        assert feature.parent_version == 2
+        assert feature.ancestors == {"main": 2}
+        assert version_control.get_version_count(document, "main") == 2
+        assert version_control.get_version_count(document, "missing") == 0
+        assert not hasattr(main.head, "__dict__")
+
+    def test_new_documents_after_restart_get_fresh_history(self, tmp_path, document, user, monkeypatch):
+        storage_path = str(tmp_path / "versions")
+        version_control = VersionControl(storage_path=storage_path)
+        document.content = "old doc content\n"
+        version_control.initialize_version_control(document)
+        document.content = "edited\n"
+        version_control.commit_changes(document, user, "Edit")
+        version_control.close()
+
+        # A new process starts counting document ids from scratch
+        monkeypatch.setattr(Document, "global_document_id", 0)
+        restarted = VersionControl(storage_path=storage_path)
+        Document.reserve_ids(restarted.get_last_document_id())
+        new_document = Document(
+            title="New Document",
+            content="fresh content\n",
+            author=user,
+            document_type=DocumentTypeEnum.CONTRACT
+        )
+        restarted.initialize_version_control(new_document)
+        new_document.content = "fresh edit\n"
+        restarted.commit_changes(new_document, user, "Edit")
+
+        assert new_document.id > document.id
+        assert [entry["content"] for entry in restarted.get_version_history(new_document)] == [
+            "fresh content\n", "fresh edit\n"
+        ]
+        assert [entry["content"] for entry in restarted.get_version_history(document)] == [
+            "old doc content\n", "edited\n"
+        ]
+        restarted.close()
+
+    def test_iter_version_history_pages_lazily(self, version_control, document, user):
+        version_control.initialize_version_control(document)
+        for index in range(1, 6):
+            document.content = f"Update {index}."
+            version_control.commit_changes(document, user, f"Change {index}")
+
+        reads = []
+        blob_get = version_control.blob_store.get
+        version_control.blob_store.get = lambda digest: reads.append(digest) or blob_get(digest)
+
+        page = version_control.get_version_history(document, offset=2, limit=2)
+        newest = next(version_control.iter_version_history(document, newest_first=True))
+        metadata = version_control.get_version_history(document, newest_first=True, include_content=False)
+
+        assert [entry["content"] for entry in page] == ["Update 2.", "Update 3."]
+        assert newest["version"] == 6
+        assert [entry["version"] for entry in metadata] == [6, 5, 4, 3, 2, 1]
+        assert all("content" not in entry for entry in metadata)
+        assert len(reads) == 3
+        assert version_control.get_version_history(document, offset=10) == []
+        with pytest.raises(ValueError):
+            version_control.get_version_history(document, limit=-1)
+
+    def test_versions_persist_across_restart(self, tmp_path, document, user):
+        storage_path = str(tmp_path / "versions")
+        version_control = VersionControl(storage_path=storage_path)
+        document.content = "A\nB\nC\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(version_control, document, user, "feature", "A1\nB\nC\n")
+        version_control.merge_branches(document, "feature", "main", user)
+        self._commit_on(version_control, document, user, "feature", "A2\nB\nC\n")
+        version_control.close()
+
+        restarted = VersionControl(storage_path=storage_path, resolve_user={user.id: user}.get)
+        self._commit_on(restarted, document, user, "main", "A1\nB\nC1\n")
+        result, _ = restarted.merge_branches(document, "feature", "main", user)
+
+        history = restarted.get_version_history(document, "feature", include_content=False)
+        assert [entry["version"] for entry in history] == [1, 2, 3]
+        assert history[1]["author"] is user
+        assert restarted.active_branches[document.id] == "main"
+        assert result is True
+        assert restarted.get_version_content(document, 4, "main") == "A2\nB\nC1\n"
+        restarted.close()
+
+    def test_lock_document(self, version_control, document, user, second_user):
+        assert version_control.lock_document(document, user) is True
+        assert version_control.lock_document(document, second_user) is False
+        assert version_control.is_document_locked(document, LockModeEnum.EXCLUSIVE) is True
+        assert version_control.unlock_document(document, second_user) is False
+        assert version_control.unlock_document(document, user) is True
+        assert version_control.is_document_locked(document) is False
+
+    def test_shared_document_locks(self, version_control, document, user, second_user):
+        assert version_control.lock_document(document, user, mode=LockModeEnum.SHARED) is True
+        assert version_control.lock_document(document, second_user, mode=LockModeEnum.SHARED) is True
+        assert version_control.lock_document(document, user) is False
+        assert version_control.is_document_locked(document, LockModeEnum.EXCLUSIVE) is False
+        assert "Document locked for reading by second_user" in [entry["entry_message"] for entry in document.history]
+
+    def test_unchanged_commit_does_not_rehash_content(self, version_control, document, user, monkeypatch):
+        version_control.initialize_version_control(document)
+        document.content = "This is the first update."
+        version_control.commit_changes(document, user, "First update")
+        hashed = []
+        monkeypatch.setattr(Document, "hash_content", staticmethod(lambda content: hashed.append(content)))
+
+        assert version_control.commit_changes(document, user, "Autosave") is False
+        assert hashed == []
+        assert version_control.get_version_count(document) == 2
+
+    def test_diff_versions_across_branches(self, version_control, document, user):
+        document.content = "A\nB\nC\n"
+        version_control.initialize_version_control(document)
+        version_control.create_branch(document, "feature", user)
+        self._commit_on(version_control, document, user, "feature", "A\nB2\nC\n")
+
+        hunks = version_control.diff_versions(document, 1, 2, from_branch="main", to_branch="feature")
+
+        assert len(hunks) == 1
+        assert hunks[0].lines == ((" ", "A\n"), ("-", "B\n"), ("+", "B2\n"), (" ", "C\n"))
+        assert version_control.get_unified_diff(document, 1, 2, "main", "feature").startswith(
+            "--- main@1\n+++ feature@2\n@@ -1,3 +1,3 @@\n")
+        assert version_control.diff_versions(document, 1, 1, "feature", "main") == []
+        assert version_control.diff_versions(document, 1, 5) is None
+
+    def test_diff_uses_stored_delta_and_cache(self, version_control, document, user, monkeypatch):
+        version_control.initialize_version_control(document)
+        document.content = "This is the initial content.\nWith a second line."
+        version_control.commit_changes(document, user, "Add a line")
+        compared = []
+        compute_hunks = version_control_system.compute_hunks
+        monkeypatch.setattr(
+            version_control_system, "compute_hunks",
+            lambda old, new, context, opcodes: compared.append(opcodes) or compute_hunks(old, new, context, opcodes))
+
+        forward = version_control.diff_versions(document, 1, 2)
+        backward = version_control.diff_versions(document, 2, 1)
+        cached = version_control.diff_versions(document, 1, 2)
+
+        assert len(compared) == 2
+        assert all(opcodes is not None for opcodes in compared)
+        assert [marker for marker, _ in forward[0].lines] == ["-", "+", "+"]
+        assert [marker for marker, _ in backward[0].lines] == ["-", "-", "+"]
+        assert [hunk.lines for hunk in cached] == [hunk.lines for hunk in forward]
+
+    def test_cached_diff_cannot_be_modified(self, version_control, document, user):
+        version_control.initialize_version_control(document)
+        document.content = "This is the initial content.\nWith a second line."
+        version_control.commit_changes(document, user, "Add a line")
+        hunks = version_control.diff_versions(document, 1, 2)
+
+        hunks.clear()
+        with pytest.raises(AttributeError):
+            version_control.diff_versions(document, 1, 2)[0].from_start = 5
+
+        cached = version_control.diff_versions(document, 1, 2)
+        assert len(cached) == 1
+        assert cached[0].from_start == 0
+        assert [marker for marker, _ in cached[0].lines] == ["-", "+", "+"]
@@ -2,6 +2,7 @@ import pytest
 
 from enums import AccessLevelEnum
 from models.access_control import AccessControl
+from models.group import Group
 from models.user import User
 
 
@@ -110,3 +111,224 @@ class TestAccessControl:
         )
 
         assert has_access is False
+
+    def test_user_access_index(self, access_control, document, user):
+        access_control.grant_access(
+            document=document,
+            user=user,
+            level=AccessLevelEnum.READ_ONLY
+        )
+        access_control.grant_access(
+            document=document,
+            user=user,
+            level=AccessLevelEnum.READ_WRITE
+        )
+
+        assert access_control.user_access == {user.id: {document.id: AccessLevelEnum.READ_WRITE}}
+        assert access_control.get_user_access(user) == {document.id: AccessLevelEnum.READ_WRITE}
+
+        access_control.revoke_access(
+            document=document,
+            user=user
+        )
+
+        assert access_control.user_access == {}
+        assert access_control.get_user_access(user) == {}
+
+    def test_list_accessible(self, access_control, document, user, second_user):
+        access_control.grant_access(
+            document=document,
+            user=user,
+            level=AccessLevelEnum.READ_ONLY
+        )
+        access_control.grant_access(
+            document=document,
+            user=second_user,
+            level=AccessLevelEnum.OWNER
+        )
+
+        assert access_control.list_accessible(user) == [document.id]
+        assert access_control.list_accessible(user, AccessLevelEnum.READ_WRITE) == []
+        assert access_control.list_accessible(second_user, AccessLevelEnum.READ_WRITE) == [document.id]
+
+    def test_group_access(self, access_control, document, user, second_user):
+        group = Group(name="Reviewers", members=[user])
+        access_control.grant_access(
+            document=document,
+            user=user,
+            level=AccessLevelEnum.READ_ONLY
+        )
+        access_control.grant_group_access(
+            document=document,
+            group=group,
+            level=AccessLevelEnum.READ_WRITE
+        )
+
+        assert access_control.check_access(document, user, AccessLevelEnum.READ_WRITE) is True
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_ONLY) is False
+        assert "Access granted to group Reviewers" in document.history[-1]["entry_message"]
+
+        group.add_member(second_user)
+
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_WRITE) is True
+        assert access_control.list_accessible(second_user) == [document.id]
+
+        group.remove_member(user)
+
+        assert access_control.get_access_level(document, user) == AccessLevelEnum.READ_ONLY
+
+        access_control.revoke_group_access(document=document, group=group)
+
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_ONLY) is False
+        assert access_control.group_documents == {}
+
+    def test_department_access(self, access_control, document, department, second_user):
+        access_control.grant_group_access(
+            document=document,
+            group=department,
+            level=AccessLevelEnum.READ_ONLY
+        )
+        department.add_member(second_user)
+
+        assert access_control.check_access(document, department.head, AccessLevelEnum.READ_ONLY) is True
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_ONLY) is True
+
+    def test_revoke_nonexistent_group_access(self, access_control, document):
+        with pytest.raises(ValueError) as error:
+            access_control.revoke_group_access(document=document, group=Group(name="Reviewers"))
+
+        assert "Reviewers does not have access to this document." in str(error.value)
+
+    def test_grant_access_bulk(self, access_control, document, user, second_user):
+        group = Group(name="Reviewers", members=[second_user])
+        initial_history_length = len(document.history)
+
+        summary = access_control.grant_access_bulk([
+            (document, user, AccessLevelEnum.OWNER),
+            (document, group, AccessLevelEnum.READ_ONLY),
+        ])
+
+        assert summary == {"granted": 2, "documents": {document.id: 2}}
+        assert access_control.check_access(document, user, AccessLevelEnum.OWNER) is True
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_ONLY) is True
+        assert document in user.documents
+        assert len(document.history) == initial_history_length + 1
+        assert document.history[-1]["entry_message"] == (
+            f"Access granted to {user.username} with level OWNER, group Reviewers with level READ_ONLY."
+        )
+
+    def test_grant_access_bulk_invalid_level(self, access_control, document, user, second_user):
+        with pytest.raises(ValueError):
+            access_control.grant_access_bulk([
+                (document, user, AccessLevelEnum.OWNER),
+                (document, second_user, "OWNER"),
+            ])
+
+        assert access_control.document_access == {}
+        assert user.documents == []
+
+    def test_revoke_access_bulk(self, access_control, document, user, second_user):
+        group = Group(name="Reviewers")
+        access_control.grant_access_bulk([
+            (document, user, AccessLevelEnum.OWNER),
+            (document, second_user, AccessLevelEnum.READ_ONLY),
+            (document, group, AccessLevelEnum.READ_ONLY),
+        ])
+
+        summary = access_control.revoke_access_bulk([(document, second_user), (document, group)])
+
+        assert summary == {"revoked": 2, "documents": {document.id: 2}}
+        assert access_control.document_access[document.id] == {user.id: AccessLevelEnum.OWNER}
+        assert access_control.group_documents == {}
+        assert document.history[-1]["entry_message"] == f"Access revoked from {second_user.username}, group Reviewers."
+
+    def test_revoke_access_bulk_is_all_or_nothing(self, access_control, document, user, second_user):
+        access_control.grant_access(document=document, user=user, level=AccessLevelEnum.OWNER)
+        initial_history_length = len(document.history)
+
+        with pytest.raises(ValueError) as error:
+            access_control.revoke_access_bulk([(document, user), (document, second_user)])
+
+        assert f"{second_user.username} does not have access to this document." in str(error.value)
+        assert access_control.check_access(document, user, AccessLevelEnum.OWNER) is True
+        assert document in user.documents
+        assert len(document.history) == initial_history_length
+
+        with pytest.raises(ValueError):
+            access_control.revoke_access_bulk([(document, user), (document, user)])
+        assert access_control.check_access(document, user, AccessLevelEnum.OWNER) is True
+
+    def test_revoke_access_bulk_user_and_department_with_same_id(
+            self, access_control, document, user, second_user, department):
+        department.id = second_user.id
+        access_control.grant_access_bulk([
+            (document, second_user, AccessLevelEnum.READ_ONLY),
+            (document, department, AccessLevelEnum.READ_WRITE),
+        ])
+
+        summary = access_control.revoke_access_bulk([(document, second_user), (document, department)])
+
+        assert summary == {"revoked": 2, "documents": {document.id: 2}}
+        assert second_user.id not in access_control.document_access[document.id]
+        assert department.id not in access_control.group_access[document.id]
+
+    def test_grant_access_bulk_invalid_document(self, access_control, document, user, second_user):
+        initial_history_length = len(document.history)
+
+        with pytest.raises(ValueError):
+            access_control.grant_access_bulk([
+                (document, user, AccessLevelEnum.OWNER),
+                (None, second_user, AccessLevelEnum.READ_ONLY),
+            ])
+
+        assert access_control.document_access == {}
+        assert document not in user.documents
+        assert len(document.history) == initial_history_length
+
+    def test_revoke_access_bulk_invalid_principal(self, access_control, document, user):
+        access_control.grant_access(document=document, user=user, level=AccessLevelEnum.OWNER)
+        initial_history_length = len(document.history)
+
+        with pytest.raises(ValueError):
+            access_control.revoke_access_bulk([(document, user), (document, "Reviewers")])
+
+        assert access_control.check_access(document, user, AccessLevelEnum.OWNER) is True
+        assert len(document.history) == initial_history_length
+
+    def test_decision_cache(self, access_control, document, user):
+        access_control.grant_access(document=document, user=user, level=AccessLevelEnum.READ_ONLY)
+
+        assert access_control.check_access(document, user, AccessLevelEnum.READ_ONLY) is True
+        assert access_control.check_access(document, user, AccessLevelEnum.READ_ONLY) is True
+        assert access_control.get_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+        access_control.revoke_access(document=document, user=user)
+
+        assert access_control.check_access(document, user, AccessLevelEnum.READ_ONLY) is False
+        assert access_control.get_cache_stats() == {"hits": 1, "misses": 2, "size": 1}
+
+    def test_decision_cache_invalidated_by_membership(self, access_control, document, user, second_user):
+        group = Group(name="Reviewers", members=[user])
+        access_control.grant_group_access(document=document, group=group, level=AccessLevelEnum.READ_WRITE)
+
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_WRITE) is False
+        assert access_control.check_access(document, user, AccessLevelEnum.READ_WRITE) is True
+
+        group.add_member(second_user)
+        group.remove_member(user)
+
+        assert access_control.check_access(document, second_user, AccessLevelEnum.READ_WRITE) is True
+        assert access_control.check_access(document, user, AccessLevelEnum.READ_WRITE) is False
+        assert access_control.cache_misses == 4
+
+    def test_decision_cache_is_bounded(self, document, user):
+        access_control = AccessControl(decision_cache_size=2)
+        access_control.grant_access(document=document, user=user, level=AccessLevelEnum.OWNER)
+
+        for level in (AccessLevelEnum.READ_ONLY, AccessLevelEnum.READ_WRITE, AccessLevelEnum.OWNER):
+            access_control.check_access(document, user, level)
+
+        assert list(access_control.decision_cache) == [
+            (document.id, user.id, AccessLevelEnum.READ_WRITE),
+            (document.id, user.id, AccessLevelEnum.OWNER),
+        ]